@@ -9,6 +9,7 @@ from .demonext_reader import DemonextReader
 from .derivatario_reader import DerivaTarioReader
 from .elixirfm_reader import ElixirFMReader
 from .germanet_reader import GermaNetReader
+from .inventory_loader import SourceReport, build_inventories
 from .kaist_ud_reader import KaistUDTReader
 from .morphynet_reader import MorphyNetDerivationalReader
 from .popoluca_reader import PopolucaDeTexistepecReader
@@ -29,6 +30,8 @@ __all__ = [
     "DerivaTarioReader",
     "ElixirFMReader",
     "GermaNetReader",
+    "SourceReport",
+    "build_inventories",
     "KaistUDTReader",
     "MorphyNetDerivationalReader",
     "PopolucaDeTexistepecReader",
@@ -1,25 +1,271 @@
+import io
+import os
+import pickle
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Tuple, List
+from hashlib import blake2b
+from typing import (
+    Any, Dict, Iterable, Iterator, Tuple, List, MutableMapping, Optional
+)
 
 from src import LexItem, WFToken, Inventory
+from src.parallel import map_ordered
+
+
+# bump to drop the cache entries written by older versions
+DATASET_CACHE_VERSION = 1
+
+# reader options which do not change the parsed dataset
+RUNTIME_PARAMS = ("cache_dir", "cache_hash", "n_workers", "chunk_bytes")
 
 
 class ReaderAbstract(ABC):
-    def __init__(self, lang: str, *args, **kwargs):
+    # "line" or "block" (separated by blank lines) for the formats
+    # which can be parsed in parallel by `_iter_lines` over file ranges
+    RECORD_FORMAT: Optional[str] = None
+
+    def __init__(
+            self,
+            lang: str,
+            *args,
+            cache_dir: Optional[str] = None,
+            cache_hash: bool = False,
+            n_workers: int = 1,
+            chunk_bytes: int = 1 << 24,
+            **kwargs
+    ):
         self.lang = lang
+        # parsed datasets are cached if a directory is given
+        self.cache_dir = cache_dir
+        # if True, the content hash is checked in addition to size and mtime
+        self.cache_hash = cache_hash
+        # parallel parsing of RECORD_FORMAT files, chunk_bytes per task
+        self.n_workers = n_workers
+        self.chunk_bytes = chunk_bytes
 
     @abstractmethod
     def build_inventory(self, *args, **kwargs) -> Inventory:
         raise NotImplementedError
 
     @abstractmethod
-    def read_dataset(self, *args, **kwargs) -> Dict[LexItem, Any]:
+    def iter_dataset(self, *args, **kwargs) -> Iterator[Tuple[LexItem, Any]]:
+        """
+        Yields (word, analysis) pairs one by one;
+        for repeated words the last pair wins.
+        """
         raise NotImplementedError
 
+    def read_dataset(self, *args, **kwargs) -> Dict[LexItem, Any]:
+        return dict(self.iter_dataset(*args, **kwargs))
+
     @abstractmethod
     def read_sample(self, *args, **kwargs) -> Tuple[LexItem, Any]:
         raise NotImplementedError
 
+    def _iter_lines(
+            self, lines: Iterable[str]
+    ) -> Iterator[Tuple[LexItem, Any]]:
+        """
+        Parses the records of a RECORD_FORMAT file (or its part).
+        """
+        raise NotImplementedError
+
+    def _get_data_start(self, f: io.BufferedReader) -> int:
+        """
+        The byte offset of the first record, e. g. after a header.
+        """
+        return 0
+
+    def iter_dataset_parallel(
+            self, path: str, n_workers: Optional[int] = None
+    ) -> Iterator[Tuple[LexItem, Any]]:
+        """
+        `iter_dataset` for large RECORD_FORMAT files:
+        the file is split into byte ranges aligned to record boundaries,
+        worker processes parse the ranges, and the results are yielded
+        in file order.
+        """
+        if self.RECORD_FORMAT is None:
+            raise NotImplementedError(
+                f"{type(self).__name__} does not support parallel parsing!"
+            )
+        n_workers = n_workers or self.n_workers
+        ranges = self._split_file(path)
+        if n_workers <= 1 or len(ranges) <= 1:
+            for start, end in ranges:
+                yield from self._read_range(path, start, end)
+            return
+
+        for pairs in self._map_ordered(
+            "_read_range",
+            [(path, start, end) for start, end in ranges],
+            n_workers
+        ):
+            yield from pairs
+
+    def _read_range(
+            self, path: str, start: int, end: int
+    ) -> List[Tuple[LexItem, Any]]:
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        # universal newlines, as in `open(path, "r")`
+        lines = io.StringIO(data.decode("utf-8"), newline=None)
+        return list(self._iter_lines(lines))
+
+    def _map_ordered(
+            self, method: str, tasks: Iterable[tuple], n_workers: int
+    ) -> Iterator[Any]:
+        """
+        Calls the method of (a copy of) the reader for each task
+        in a process pool and yields the results in order,
+        see `map_ordered`.
+        """
+        return map_ordered(
+            _call_reader_method,
+            ((method, args) for args in tasks),
+            n_workers, initializer=_init_reader_worker, initargs=(self,)
+        )
+
+    def _split_file(self, path: str) -> List[Tuple[int, int]]:
+        ranges = []
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            start = self._get_data_start(f)
+            while start < size:
+                f.seek(start + self.chunk_bytes - 1)
+                # finish the current line, and the current block if needed
+                f.readline()
+                if self.RECORD_FORMAT == "block":
+                    for line in iter(f.readline, b""):
+                        if not line.strip():
+                            break
+                end = min(f.tell(), size)
+                ranges.append((start, end))
+                start = end
+        return ranges
+
+    def _iter_source(
+            self, path: str, *args, **kwargs
+    ) -> Iterator[Tuple[LexItem, Any]]:
+        if (
+            self.n_workers > 1 and self.RECORD_FORMAT is not None
+            and not args and not kwargs
+        ):
+            return self.iter_dataset_parallel(path)
+        return self.iter_dataset(path, *args, **kwargs)
+
+    def load_dataset(
+            self, path: str, *args, **kwargs
+    ) -> Iterator[Tuple[LexItem, Any]]:
+        """
+        `iter_dataset` with a cache of parsed datasets in `cache_dir`.
+        An entry is keyed on the reader class, its parameters and the path,
+        and it is only used while the file fingerprint
+        (size, mtime and, optionally, the content hash) is unchanged.
+        """
+        if self.cache_dir is None:
+            yield from self._iter_source(path, *args, **kwargs)
+            return
+
+        cache_path = self._get_cache_path(path, *args, **kwargs)
+        fingerprint = self._get_fingerprint(path)
+        if os.path.isfile(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    cached_fingerprint, dataset = pickle.load(f)
+                if cached_fingerprint == fingerprint:
+                    yield from dataset.items()
+                    return
+            except Exception as e:
+                print(f"Broken dataset cache {cache_path}: {e}")
+
+        dataset = {}
+        for word, analysis in self._iter_source(path, *args, **kwargs):
+            dataset[word] = analysis
+            yield word, analysis
+        # the stale entry (if any) is overwritten
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((fingerprint, dataset), f, protocol=-1)
+        os.replace(tmp_path, cache_path)
+
+    def _fill(
+            self,
+            mapping: Optional[MutableMapping],
+            path: str,
+            rules_by_ids: Optional[Dict[str, Any]] = None
+    ) -> MutableMapping:
+        """
+        Streams the dataset into the mapping (a new dict if it is None)
+        and returns the mapping. Any mapping can be filled, e. g.
+        a table of an on-disk store. With `rules_by_ids`, the rules of
+        the loaded pairs are added to it by `_make_rule`; the other
+        entries of the mapping are not read.
+        """
+        if mapping is None:
+            mapping = {}
+        pairs = self.load_dataset(path)
+        if rules_by_ids is not None:
+            pairs = self._iter_with_rules(pairs, rules_by_ids)
+        mapping.update(pairs)
+        return mapping
+
+    def _iter_with_rules(
+            self,
+            pairs: Iterable[Tuple[LexItem, Any]],
+            rules_by_ids: Dict[str, Any]
+    ) -> Iterator[Tuple[LexItem, Any]]:
+        for word, analysis in pairs:
+            # the ids include the POS tags, so the rule is the same
+            if analysis.rule_id not in rules_by_ids:
+                rule = self._make_rule(word, analysis)
+                if rule is not None:
+                    rules_by_ids[analysis.rule_id] = rule
+            yield word, analysis
+
+    def _make_rule(self, word: LexItem, analysis: Any) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _get_cache_path(self, path: str, *args, **kwargs) -> str:
+        params = {
+            k: v for k, v in vars(self).items()
+            if k not in RUNTIME_PARAMS
+        }
+        key = repr((
+            DATASET_CACHE_VERSION,
+            type(self).__module__, type(self).__qualname__,
+            sorted(params.items()),
+            os.path.abspath(path), args, sorted(kwargs.items())
+        ))
+        digest = blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(
+            self.cache_dir, f"{type(self).__name__}-{digest}.pkl"
+        )
+
+    def _get_fingerprint(self, path: str) -> Tuple:
+        stat = os.stat(path)
+        fingerprint = (stat.st_size, stat.st_mtime_ns)
+        if self.cache_hash:
+            h = blake2b()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            fingerprint += (h.hexdigest(),)
+        return fingerprint
+
+
+_worker_reader: Optional[ReaderAbstract] = None
+
+
+def _init_reader_worker(reader: ReaderAbstract):
+    global _worker_reader
+    _worker_reader = reader
+
+
+def _call_reader_method(method: str, args: tuple) -> Any:
+    return getattr(_worker_reader, method)(*args)
+
 
 class AnalysesReaderAbstract(ReaderAbstract, ABC):
     @abstractmethod
@@ -32,9 +278,14 @@ class AnalysesReaderAbstract(ReaderAbstract, ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def read_dataset(self, *args, **kwargs) -> Dict[LexItem, WFToken]:
+    def iter_dataset(
+            self, *args, **kwargs
+    ) -> Iterator[Tuple[LexItem, WFToken]]:
         raise NotImplementedError
 
+    def read_dataset(self, *args, **kwargs) -> Dict[LexItem, WFToken]:
+        return dict(self.iter_dataset(*args, **kwargs))
+
     @abstractmethod
     def read_sample(self, *args, **kwargs) -> List[Tuple[LexItem, WFToken]]:
         raise NotImplementedError
@@ -1,7 +1,7 @@
-from typing import Dict, Tuple, List
+from typing import Iterable, Iterator, Tuple, List, MutableMapping, Optional
 
 from src import (
-    LexItem, WFToken,
+    LexItem, make_lex_item, WFToken,
     RuleInfo,
     Inventory
 )
@@ -20,6 +20,8 @@ class AuCoProReader(AnalysesReaderAbstract):
 
     https://gerhard.pro/research-projects/aucopro/
     """
+    RECORD_FORMAT = "line"
+
     def __init__(self, lang: str, *args, **kwargs):
         super().__init__(lang, *args, **kwargs)
 
@@ -47,26 +49,27 @@ class AuCoProReader(AnalysesReaderAbstract):
             self,
             path: str,
             bracketing_strategy: str = "last",
+            word_analyses: Optional[MutableMapping] = None,
             **kwargs
     ) -> Inventory:
-
-        compound_analyses = self.read_dataset(path)
+        word_analyses = self._fill(word_analyses, path)
 
         inventory = Inventory(
-            word_analyses=compound_analyses,
+            word_analyses=word_analyses,
             rules_by_ids=self.interfix_rules,
             bracketing_strategy=bracketing_strategy
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, WFToken]:
+    def iter_dataset(self, path: str) -> Iterator[Tuple[LexItem, WFToken]]:
         with open(path, "r") as f:
-            lines = f.readlines()
-        results = {}
+            yield from self._iter_lines(f)
+
+    def _iter_lines(
+            self, lines: Iterable[str]
+    ) -> Iterator[Tuple[LexItem, WFToken]]:
         for line in lines:
-            for word, analysis in self.read_sample(line.strip()):
-                results[word] = analysis
-        return results
+            yield from self.read_sample(line.strip())
 
     def read_sample(self, line: str) -> List[Tuple[LexItem, WFToken]]:
         result = []
@@ -86,7 +89,7 @@ class AuCoProReader(AnalysesReaderAbstract):
             lemma = stem
             upos = d_upos if i == len(compound_items) - 1 else "_"
 
-            subword = LexItem(
+            subword = make_lex_item(
                 lang=self.lang,
                 lemma=lemma,
                 form=form,
@@ -106,7 +109,7 @@ class AuCoProReader(AnalysesReaderAbstract):
                 continue
 
             interfixed_analysis = WFToken(
-                d_from=LexItem(
+                d_from=make_lex_item(
                     lang=self.lang,
                     lemma=lemma,
                     form=lemma,
@@ -114,7 +117,7 @@ class AuCoProReader(AnalysesReaderAbstract):
                 ),
                 rule_id=f"INTERFIX({upos})(-{interfix_form})"
             )
-            form_lex = LexItem(
+            form_lex = make_lex_item(
                 lang=self.lang,
                 lemma=lemma,
                 form=form,
@@ -122,7 +125,7 @@ class AuCoProReader(AnalysesReaderAbstract):
             )
             result.append((form_lex, interfixed_analysis))
 
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             lemma=derived_lemma,
             form=derived_lemma,
@@ -1,7 +1,7 @@
-from typing import Dict, List, Tuple
+from typing import List, Tuple, Iterable, Iterator, MutableMapping, Optional
 
 from src import (
-    LexItem,
+    LexItem, make_lex_item,
     CONLLUToken, CONLLUTree,
     Inventory
 )
@@ -27,6 +27,8 @@ class CharDepsReader(ReaderAbstract):
 
     https://bcmi.sjtu.edu.cn/~zebraform/
     """
+    RECORD_FORMAT = "block"
+
     POS2UPOS = {
         # absolute POS tags
         "p": "PRON",
@@ -43,26 +45,32 @@ class CharDepsReader(ReaderAbstract):
         "f": "AFFIX",
     }
 
-    def build_inventory(self, path: str) -> Inventory:
-        word_trees = self.read_dataset(path)
+    def build_inventory(
+            self,
+            path: str,
+            word_trees: Optional[MutableMapping] = None
+    ) -> Inventory:
+        word_trees = self._fill(word_trees, path)
         inventory = Inventory(
             word_trees=word_trees
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, CONLLUTree]:
+    def iter_dataset(
+            self, path: str
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
         with open(path, "r") as f:
-            lines = f.readlines()
-
-        results = {}
+            yield from self._iter_lines(f)
 
+    def _iter_lines(
+            self, lines: Iterable[str]
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
         cur_lines = []
         cur_id = "0"
         for line in lines:
             line = line.strip()
             if not line:
-                for word, analysis in self.read_sample(cur_lines, cur_id):
-                    results[word] = analysis
+                yield from self.read_sample(cur_lines, cur_id)
                 cur_lines = []
                 continue
             if line.startswith("["):
@@ -72,10 +80,7 @@ class CharDepsReader(ReaderAbstract):
             cur_lines.append(line)
         else:
             if cur_lines:
-                for word, analysis in self.read_sample(cur_lines, cur_id):
-                    results[word] = analysis
-
-        return results
+                yield from self.read_sample(cur_lines, cur_id)
 
     def read_sample(
             self, cur_lines: List[str], cur_id: str
@@ -99,7 +104,7 @@ class CharDepsReader(ReaderAbstract):
         word_tree = CONLLUTree(tokens)
 
         lemma = "".join([t.form for t in tokens])
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             # lid=cur_id,
             form=lemma,
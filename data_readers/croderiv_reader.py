@@ -1,9 +1,9 @@
 from html.parser import HTMLParser
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Iterator, MutableMapping, Optional
 
 from src import (
-    LexItem,
-    CONLLUToken, CONLLUTree,
+    LexItem, make_lex_item,
+    CONLLUToken, CONLLUTree, CONLLUTreeBuilder,
     Inventory
 )
 from data_readers.abstract_readers import ReaderAbstract
@@ -118,32 +118,48 @@ class CroDeriVReader(ReaderAbstract):
     http://croderiv.ffzg.hr/
     """
 
-    def build_inventory(self, path: str) -> Inventory:
-        word_trees = self.read_dataset(path)
+    def build_inventory(
+            self,
+            path: str,
+            word_trees: Optional[MutableMapping] = None
+    ) -> Inventory:
+        word_trees = self._fill(word_trees, path)
         inventory = Inventory(
             word_trees=word_trees,
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, CONLLUTree]:
+    def iter_dataset(
+            self, path: str
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
         parser = CroDeriVHTMLParser()
-        doc = open(path).read()
-        parser.feed(doc)
-
-        results = {}
-
-        for lemma, segmentation in parser.analyses:
+        with open(path) as f:
+            rest = ""
+            for chunk in iter(lambda: f.read(1 << 20), ""):
+                # cut after a tag so that no text is split between calls
+                data = rest + chunk
+                cut = data.rfind(">") + 1
+                parser.feed(data[:cut])
+                rest = data[cut:]
+                yield from self._read_samples(parser.analyses)
+                parser.analyses = []
+            parser.feed(rest)
+        parser.close()
+        yield from self._read_samples(parser.analyses)
+
+    def _read_samples(
+            self, analyses: List[Tuple[str, List[Dict[str, str]]]]
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
+        for lemma, segmentation in analyses:
             try:
-                for word, analysis in self.read_sample(lemma, segmentation):
-                    results[word] = analysis
+                yield from self.read_sample(lemma, segmentation)
             except Exception as e:
                 print(e)
-        return results
 
     def read_sample(
             self, lemma: str, segmentation: List[Dict[str, str]]
     ) -> List[Tuple[LexItem, CONLLUTree]]:
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             form=lemma,
             lemma=lemma,
@@ -173,7 +189,7 @@ class CroDeriVReader(ReaderAbstract):
         assert stems, \
             f"Incorrect verb {lemma} without a stem! {segmentation}"
 
-        word_tree = CONLLUTree([stems[-1]])
+        word_builder = CONLLUTreeBuilder(CONLLUTree([stems[-1]]))
 
         # first merge the stems
         if len(stems) > 1:
@@ -190,28 +206,30 @@ class CroDeriVReader(ReaderAbstract):
                 secondary_tree = Inventory.merge_trees(
                     secondary_tree, affix_tree, deprel="infl", is_arc_l2r=True
                 )
-            word_tree = Inventory.merge_trees(
-                secondary_tree, word_tree, deprel="compound", is_arc_l2r=False
+            word_builder.attach_left(
+                secondary_tree, deprel="compound", is_arc_l2r=False
             )
 
         for prefix_token in reversed(tokens_by_class["Prefix"]):
             affix_tree = CONLLUTree([prefix_token])
-            word_tree = Inventory.merge_trees(
-                affix_tree, word_tree, deprel="deriv", is_arc_l2r=False
+            word_builder.attach_left(
+                affix_tree, deprel="deriv", is_arc_l2r=False
             )
 
         for suffix_token in tokens_by_class["Suffix"]:
             affix_tree = CONLLUTree([suffix_token])
-            word_tree = Inventory.merge_trees(
-                word_tree, affix_tree, deprel="deriv", is_arc_l2r=True
+            word_builder.attach_right(
+                affix_tree, deprel="deriv", is_arc_l2r=True
             )
 
         for suffix_token in tokens_by_class["Ending"]:
             affix_tree = CONLLUTree([suffix_token])
-            word_tree = Inventory.merge_trees(
-                word_tree, affix_tree, deprel="infl", is_arc_l2r=True
+            word_builder.attach_right(
+                affix_tree, deprel="infl", is_arc_l2r=True
             )
 
+        word_tree = word_builder.build()
+
         if lemma.endswith(" se") and word_tree.tokens[-1] != "se":
             # reflexive
             clitic_token = CONLLUToken(
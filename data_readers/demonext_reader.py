@@ -1,8 +1,8 @@
 import pandas as pd
-from typing import Dict, Tuple, List
+from typing import Iterator, List, MutableMapping, Optional, Tuple
 
 from src import (
-    LexItem, WFToken,
+    LexItem, make_lex_item, WFToken,
     RuleInfo, ComplexRuleInfo,
     Inventory
 )
@@ -52,73 +52,109 @@ class DemonextReader(AnalysesReaderAbstract):
         "conv": "CONV",
     }
 
+    def __init__(self, lang: str, chunk_size: int = 100000, **kwargs):
+        super().__init__(lang, **kwargs)
+        # rows per `read_csv` chunk
+        self.chunk_size = chunk_size
+
     def build_inventory(
             self,
             path: str,
             bracketing_strategy: str = "last",
+            word_analyses: Optional[MutableMapping] = None,
             **kwargs
     ) -> Inventory:
-        derivations_analyses = self.read_dataset(path)
-
         rules_by_ids = {}
-        for k, v in derivations_analyses.items():
-            rule_id = v.rule_id  # 'pre-suf:(antiXique)(NOUN) -> ADJ'
-            pattern = rule_id[rule_id.find("(")+1:rule_id.find(")")]
-            pattern = pattern.replace("X", "-")
-            process = rule_id[:rule_id.find(":")]
-
-            if process == "pre-suf":
-                affixes = pattern.split('-')
-                prefix, suffix = affixes
-                suffix_rule = RuleInfo(
-                    short_id=f"-{suffix}",
-                    info=self.PROCESS2INFO["suf"],
-                    pos_b=v.d_from.upos,
-                    pos_a=k.upos
-                )
-                prefix_rule = RuleInfo(
-                    short_id=f"{prefix}-",
-                    info=self.PROCESS2INFO["pre"],
-                    pos_b=k.upos,
-                    pos_a=k.upos
-                )
-                rule = ComplexRuleInfo(
-                    short_id="",
-                    info="PFX,SFX",
-                    pos_b=v.d_from.upos,
-                    pos_a=k.upos,
-                    simple_rules=[suffix_rule, prefix_rule]
-                )
-            elif process in ["pre", "suf", "conv"]:
-                rule = RuleInfo(
-                    short_id=pattern,
-                    info=self.PROCESS2INFO[process],
-                    pos_b=v.d_from.upos,
-                    pos_a=k.upos
-                )
-            else:
-                raise ValueError(process)
-
-            rules_by_ids[rule_id] = rule
+        word_analyses = self._fill(word_analyses, path, rules_by_ids)
 
         inventory = Inventory(
-            word_analyses=derivations_analyses,
+            word_analyses=word_analyses,
             rules_by_ids=rules_by_ids,
             bracketing_strategy=bracketing_strategy
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, WFToken]:
-        results = {}
-        df = pd.read_csv(path, sep="\t").astype(str)
-        for i in range(len(df)):
-            line = df.loc[i]
-            if i > 1000:
-                break
-            analyses = self.read_sample(line)
-            for word, analysis in analyses:
-                results[word] = analysis
-        return results
+    def _make_rule(self, k: LexItem, v: WFToken) -> RuleInfo:
+        rule_id = v.rule_id  # 'pre-suf:(antiXique)(NOUN) -> ADJ'
+        pattern = rule_id[rule_id.find("(")+1:rule_id.find(")")]
+        pattern = pattern.replace("X", "-")
+        process = rule_id[:rule_id.find(":")]
+
+        if process == "pre-suf":
+            affixes = pattern.split('-')
+            prefix, suffix = affixes
+            suffix_rule = RuleInfo(
+                short_id=f"-{suffix}",
+                info=self.PROCESS2INFO["suf"],
+                pos_b=v.d_from.upos,
+                pos_a=k.upos
+            )
+            prefix_rule = RuleInfo(
+                short_id=f"{prefix}-",
+                info=self.PROCESS2INFO["pre"],
+                pos_b=k.upos,
+                pos_a=k.upos
+            )
+            rule = ComplexRuleInfo(
+                short_id="",
+                info="PFX,SFX",
+                pos_b=v.d_from.upos,
+                pos_a=k.upos,
+                simple_rules=[suffix_rule, prefix_rule]
+            )
+        elif process in ["pre", "suf", "conv"]:
+            rule = RuleInfo(
+                short_id=pattern,
+                info=self.PROCESS2INFO[process],
+                pos_b=v.d_from.upos,
+                pos_a=k.upos
+            )
+        else:
+            raise ValueError(process)
+        return rule
+
+    def iter_dataset(self, path: str) -> Iterator[Tuple[LexItem, WFToken]]:
+        columns = [
+            "graph_1", "graph_2", "cat_1", "cat_2", "type_cstr_1", "cstr_1"
+        ]
+        for df in pd.read_csv(
+            path, sep="\t", usecols=columns, chunksize=self.chunk_size
+        ):
+            # column-wise counterpart of `read_sample`
+            df = df.astype(str)
+            upos_d_column = df["cat_1"].map(self.POS2UPOS).fillna("_")
+            upos_s_column = df["cat_2"].map(self.POS2UPOS).fillna("_")
+            rule_id_column = (
+                df["type_cstr_1"] + ":(" + df["cstr_1"] + ")("
+                + upos_s_column + ") -> " + upos_d_column
+            )
+            for (
+                derived_lemma, source_lemma, xpos_d, xpos_s,
+                upos_d, upos_s, rule_id
+            ) in zip(
+                df["graph_1"].tolist(), df["graph_2"].tolist(),
+                df["cat_1"].tolist(), df["cat_2"].tolist(),
+                upos_d_column.tolist(), upos_s_column.tolist(),
+                rule_id_column.tolist()
+            ):
+                word = make_lex_item(
+                    lang=self.lang,
+                    lemma=derived_lemma,
+                    form=derived_lemma,
+                    upos=upos_d,
+                    xpos=xpos_d
+                )
+                analysis = WFToken(
+                    d_from=make_lex_item(
+                        lang=self.lang,
+                        lemma=source_lemma,
+                        form=source_lemma,
+                        upos=upos_s,
+                        xpos=xpos_s
+                    ),
+                    rule_id=rule_id
+                )
+                yield word, analysis
 
     def read_sample(self, line: pd.Series) -> List[Tuple[LexItem, WFToken]]:
         derived_lemma = line["graph_1"]
@@ -130,7 +166,7 @@ class DemonextReader(AnalysesReaderAbstract):
         process = line["type_cstr_1"]
         rule_id = line["cstr_1"]
 
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             lemma=derived_lemma,
             form=derived_lemma,
@@ -139,7 +175,7 @@ class DemonextReader(AnalysesReaderAbstract):
         )
 
         analysis = WFToken(
-            d_from=LexItem(
+            d_from=make_lex_item(
                 lang=self.lang,
                 lemma=source_lemma,
                 form=source_lemma,
@@ -1,8 +1,8 @@
-from typing import Dict, List, Tuple
+from typing import List, Tuple, Iterable, Iterator, MutableMapping, Optional
 
 from src import (
-    LexItem,
-    CONLLUToken, CONLLUTree,
+    LexItem, make_lex_item,
+    CONLLUToken, CONLLUTree, CONLLUTreeBuilder,
     Inventory
 )
 from data_readers.abstract_readers import ReaderAbstract
@@ -16,6 +16,8 @@ class DerivaTarioReader(ReaderAbstract):
 
     https://derivatario.sns.it
     """
+    RECORD_FORMAT = "line"
+
     prefixes = {
         "acons", "anti", "auto", "bi", "tri", "de", "1de", "2de", "dis", "in",
         "micro", "mini", "ri", "1s", "2s", "co", "neo", "1in", "2in", "a",
@@ -24,31 +26,35 @@ class DerivaTarioReader(ReaderAbstract):
         "stra", "trans", "fra"
     }
 
-    def build_inventory(self, path: str) -> Inventory:
-        word_trees = self.read_dataset(path)
+    def build_inventory(
+            self,
+            path: str,
+            word_trees: Optional[MutableMapping] = None
+    ) -> Inventory:
+        word_trees = self._fill(word_trees, path)
         inventory = Inventory(
             word_trees=word_trees
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, CONLLUTree]:
+    def iter_dataset(
+            self, path: str
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
         with open(path, "r") as f:
-            lines = f.readlines()
-
-        results = {}
+            yield from self._iter_lines(f)
 
+    def _iter_lines(
+            self, lines: Iterable[str]
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
         for line in lines:
-            for word, analysis in self.read_sample(line):
-                results[word] = analysis
-
-        return results
+            yield from self.read_sample(line)
 
     def read_sample(
             self, line: str
     ) -> List[Tuple[LexItem, CONLLUTree]]:
         lemma_id, lemma, base, *affixes = line.lower().strip("\n;").split(";")
 
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             # lid=lemma_id,
             form=lemma,
@@ -65,7 +71,7 @@ class DerivaTarioReader(ReaderAbstract):
             lemma=base_lemma,
         )
 
-        word_tree = CONLLUTree([root_token])
+        word_builder = CONLLUTreeBuilder(CONLLUTree([root_token]))
 
         for affix in affixes:
             morpheme, allomorph = affix.split(":")[:2]
@@ -78,16 +84,16 @@ class DerivaTarioReader(ReaderAbstract):
             )
             affix_tree = CONLLUTree([affix_token])
             if morpheme in self.prefixes:
-                word_tree = Inventory.merge_trees(
-                    affix_tree, word_tree, deprel="deriv", is_arc_l2r=False
+                word_builder.attach_left(
+                    affix_tree, deprel="deriv", is_arc_l2r=False
                 )
             else:
                 # suffix, conversion, backformation, shortening
-                word_tree = Inventory.merge_trees(
-                    word_tree, affix_tree, deprel="deriv", is_arc_l2r=True
+                word_builder.attach_right(
+                    affix_tree, deprel="deriv", is_arc_l2r=True
                 )
 
-        return [(word, word_tree)]
+        return [(word, word_builder.build())]
 
 
 # Italian example
@@ -1,13 +1,15 @@
 import re
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple, Iterator, MutableMapping, Optional
 from xml.etree import ElementTree as ET
 
 from src import (
-    LexItem,
-    CONLLUToken, CONLLUTree,
+    LexItem, make_lex_item,
+    CONLLUToken, CONLLUTree, CONLLUTreeBuilder,
     Inventory
 )
 from data_readers.abstract_readers import ReaderAbstract
+from data_readers.xml_stream import iter_xml_elements
 
 
 class ElixirFMReader(ReaderAbstract):
@@ -28,25 +30,28 @@ class ElixirFMReader(ReaderAbstract):
         "Xtra": "X",
     }
 
-    def build_inventory(self, path: str) -> Inventory:
-        word_trees = self.read_dataset(path)
+    # a placeholder of the root in the compiled templates
+    ROOT_SLOT = "\0"
+
+    def build_inventory(
+            self,
+            path: str,
+            word_trees: Optional[MutableMapping] = None
+    ) -> Inventory:
+        word_trees = self._fill(word_trees, path)
         inventory = Inventory(
             word_trees=word_trees
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, CONLLUTree]:
-        xml = ET.parse(path)
-        results = {}
-
-        for block in xml.getroot():
-            if block.tag.replace(self.XMLNS, "") != "data":
+    def iter_dataset(
+            self, path: str
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
+        # nests of the records, i. e. ElixirFM/data/Cluster/Nest
+        for ancestors, nest in iter_xml_elements(path, depth=3):
+            if ancestors[1].tag.replace(self.XMLNS, "") != "data":
                 continue
-            for record in block:
-                analyses = self.read_sample(record)
-                for word, analysis in analyses:
-                    results[word] = analysis
-        return results
+            yield from self.read_nest(nest)
 
     def read_sample(self, record: ET) -> List[Tuple[LexItem, CONLLUTree]]:
         analyses = []
@@ -76,13 +81,25 @@ class ElixirFMReader(ReaderAbstract):
         )
         root_tree = CONLLUTree([root_token])
 
+        # the entries of the nest share trees with the same pattern
+        trees_by_pattern = {}
         for entry in entries:
-            analyses_entry = self.read_entry(entry, root_tree)
+            analyses_entry = self.read_entry(
+                entry, root_tree, trees_by_pattern
+            )
             analyses.extend(analyses_entry)
 
         return analyses
 
-    def read_entry(self, entry: ET, root_tree: CONLLUTree):
+    def read_entry(
+            self,
+            entry: ET,
+            root_tree: CONLLUTree,
+            trees_by_pattern: Optional[Dict[str, CONLLUTree]] = None
+    ):
+        if trees_by_pattern is None:
+            trees_by_pattern = {}
+        root_orth = root_tree.tokens[root_tree.root_idx].form
         analyses = []
         morphs, entity = None, None
         for c in entry:
@@ -94,12 +111,16 @@ class ElixirFMReader(ReaderAbstract):
             morphs_pattern, morphs_enc, morphs_orth, morphs_bw
         ) = morphs.text.split("\t")
 
-        word_tree = self.attach_morphs(root_tree, morphs_pattern)
+        word_tree = trees_by_pattern.get(morphs_pattern)
+        if word_tree is None:
+            word_tree = trees_by_pattern[morphs_pattern] = self.fill_morphs(
+                root_orth, morphs_pattern
+            )
 
         for info in entity:
             xpos_d = info.tag.replace(self.XMLNS, "")
             upos_d = self.POS_TO_UPOS.get(xpos_d, "X")
-            word = LexItem(
+            word = make_lex_item(
                 lang=self.lang,
                 form=morphs_orth,
                 lemma=morphs_orth,
@@ -115,9 +136,12 @@ class ElixirFMReader(ReaderAbstract):
                     fmorphs_pattern, fmorphs_enc, fmorphs_orth, fmorphs_bw
                 ) = form_morphs
 
-                form_tree = self.attach_morphs(root_tree, fmorphs_pattern)
+                form_tree = trees_by_pattern.get(fmorphs_pattern)
+                if form_tree is None:
+                    form_tree = self.fill_morphs(root_orth, fmorphs_pattern)
+                    trees_by_pattern[fmorphs_pattern] = form_tree
 
-                form = LexItem(
+                form = make_lex_item(
                     lang=self.lang,
                     form=fmorphs_orth,
                     lemma=fmorphs_orth,
@@ -127,6 +151,54 @@ class ElixirFMReader(ReaderAbstract):
                 analyses.append((form, form_tree))
         return analyses
 
+    @classmethod
+    def fill_morphs(cls, root_orth: str, morphs_pattern: str) -> CONLLUTree:
+        """
+        The same tree as `attach_morphs` gives for a single-token root,
+        instantiated from the compiled template of the pattern.
+        """
+        rows, root_idx = cls.compile_morphs(morphs_pattern)
+        tokens = []
+        for i, (form, head, deprel) in enumerate(rows):
+            if form is None:
+                form = root_orth
+            tokens.append(CONLLUToken(
+                idx=str(i + 1),
+                form=form,
+                lemma=form,
+                head=head,
+                deprel=deprel
+            ))
+        return CONLLUTree(tokens, root_idx=root_idx)
+
+    @staticmethod
+    @lru_cache(maxsize=10000)
+    def compile_morphs(
+            morphs_pattern: str
+    ) -> Tuple[Tuple[Tuple[Optional[str], str, str], ...], int]:
+        """
+        Compiles the pattern into a template: (form, head, deprel) rows,
+        where the form of the root is None, and the index of the root.
+        """
+        slot_token = CONLLUToken(
+            idx="1",
+            form=ElixirFMReader.ROOT_SLOT,
+            lemma=ElixirFMReader.ROOT_SLOT,
+        )
+        tree = ElixirFMReader.attach_morphs(
+            CONLLUTree([slot_token]), morphs_pattern
+        )
+        rows = tuple(
+            (
+                None if token.form == ElixirFMReader.ROOT_SLOT
+                else token.form,
+                token.head,
+                token.deprel
+            )
+            for token in tree.tokens
+        )
+        return rows, tree.root_idx
+
     @staticmethod
     def attach_morphs(
             root_tree: CONLLUTree,
@@ -166,9 +238,8 @@ class ElixirFMReader(ReaderAbstract):
 
         # order of attachment: root -> transfix -> modifiers -> affixes
 
-        if stem == "_____":  # stem without changes
-            word_tree = root_tree
-        else:
+        word_builder = CONLLUTreeBuilder(root_tree)
+        if stem != "_____":  # stem with changes
             # e.g. "FuCAL"
             transfix_token = CONLLUToken(
                 idx="1",
@@ -176,8 +247,8 @@ class ElixirFMReader(ReaderAbstract):
                 lemma=stem,
             )
             transfix_tree = CONLLUTree([transfix_token])
-            word_tree = Inventory.merge_trees(
-                root_tree, transfix_tree, deprel="deriv", is_arc_l2r=True
+            word_builder.attach_right(
+                transfix_tree, deprel="deriv", is_arc_l2r=True
             )
 
         for dep in reversed(ldeps):
@@ -187,8 +258,8 @@ class ElixirFMReader(ReaderAbstract):
                 lemma=dep,
             )
             dep_tree = CONLLUTree([dep_token])
-            word_tree = Inventory.merge_trees(
-                dep_tree, word_tree, deprel="compound", is_arc_l2r=False
+            word_builder.attach_left(
+                dep_tree, deprel="compound", is_arc_l2r=False
             )
 
         for dep in rdeps:
@@ -198,8 +269,8 @@ class ElixirFMReader(ReaderAbstract):
                 lemma=dep,
             )
             dep_tree = CONLLUTree([dep_token])
-            word_tree = Inventory.merge_trees(
-                word_tree, dep_tree, deprel="compound", is_arc_l2r=True
+            word_builder.attach_right(
+                dep_tree, deprel="compound", is_arc_l2r=True
             )
 
         for affix in reversed(prefixes):
@@ -209,8 +280,8 @@ class ElixirFMReader(ReaderAbstract):
                 lemma=affix,
             )
             affix_tree = CONLLUTree([affix_token])
-            word_tree = Inventory.merge_trees(
-                affix_tree, word_tree, deprel="deriv", is_arc_l2r=False
+            word_builder.attach_left(
+                affix_tree, deprel="deriv", is_arc_l2r=False
             )
 
         for affix in suffixes:
@@ -220,9 +291,10 @@ class ElixirFMReader(ReaderAbstract):
                 lemma=affix,
             )
             affix_tree = CONLLUTree([affix_token])
-            word_tree = Inventory.merge_trees(
-                word_tree, affix_tree, deprel="deriv", is_arc_l2r=True
+            word_builder.attach_right(
+                affix_tree, deprel="deriv", is_arc_l2r=True
             )
+        word_tree = word_builder.build()
         return word_tree
 
 
@@ -1,7 +1,9 @@
-from typing import Dict, Tuple, List
+from io import BufferedReader
+from itertools import islice
+from typing import Iterable, Iterator, List, MutableMapping, Optional, Tuple
 
 from src import (
-    LexItem, WFToken,
+    LexItem, make_lex_item, WFToken,
     RuleInfo,
     Inventory
 )
@@ -21,6 +23,8 @@ class GermaNetReader(AnalysesReaderAbstract):
 
     https://uni-tuebingen.de/fakultaeten/philosophische-fakultaet/fachbereiche/neuphilologie/seminar-fuer-sprachwissenschaft/arbeitsbereiche/allg-sprachwissenschaft-computerlinguistik/ressourcen/lexica/germanet-1/
     """
+    RECORD_FORMAT = "line"
+
     def __init__(self, lang: str, n_lines_skip: int = 2, **kwargs):
         super().__init__(lang, **kwargs)
         self.n_lines_skip = n_lines_skip
@@ -90,22 +94,25 @@ class GermaNetReader(AnalysesReaderAbstract):
             self,
             path: str,
             bracketing_strategy: str = "last",
+            word_analyses: Optional[MutableMapping] = None,
             **kwargs
     ) -> Inventory:
-
-        compound_analyses = self.read_dataset(path)
+        word_analyses = self._fill(word_analyses, path)
 
         inventory = Inventory(
-            word_analyses=compound_analyses,
+            word_analyses=word_analyses,
             rules_by_ids=self.interfix_rules,
             bracketing_strategy=bracketing_strategy
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, WFToken]:
+    def iter_dataset(self, path: str) -> Iterator[Tuple[LexItem, WFToken]]:
         with open(path, "r") as f:
-            lines = f.readlines()[self.n_lines_skip:]
-        results = {}
+            yield from self._iter_lines(islice(f, self.n_lines_skip, None))
+
+    def _iter_lines(
+            self, lines: Iterable[str]
+    ) -> Iterator[Tuple[LexItem, WFToken]]:
         for line in lines:
             try:
                 analyses = self.read_sample(line.strip())
@@ -115,9 +122,12 @@ class GermaNetReader(AnalysesReaderAbstract):
                     f"as its modifier differs from the written form: {e}!"
                 )
                 continue
-            for word, analysis in analyses:
-                results[word] = analysis
-        return results
+            yield from analyses
+
+    def _get_data_start(self, f: BufferedReader) -> int:
+        for _ in range(self.n_lines_skip):
+            f.readline()
+        return f.tell()
 
     @staticmethod
     def clean(word: str) -> str:
@@ -162,7 +172,7 @@ class GermaNetReader(AnalysesReaderAbstract):
                 else:
                     continue
                 surface_form = derived_lemma[idx:cur_end]
-                subword = LexItem(
+                subword = make_lex_item(
                     lang=self.lang,
                     lemma=lemma,
                     form=surface_form,
@@ -182,7 +192,7 @@ class GermaNetReader(AnalysesReaderAbstract):
                     # unknown interfix
                     rule_id = f"INTREFIX({pos})(_)"
                 interfixed_analysis = WFToken(
-                    d_from=LexItem(
+                    d_from=make_lex_item(
                         lang=self.lang,
                         lemma=lemma,
                         form=lemma,
@@ -190,7 +200,7 @@ class GermaNetReader(AnalysesReaderAbstract):
                     ),
                     rule_id=rule_id
                 )
-                form_lex = LexItem(
+                form_lex = make_lex_item(
                     lang=self.lang,
                     lemma=lemma,
                     form=surface_form,
@@ -203,7 +213,7 @@ class GermaNetReader(AnalysesReaderAbstract):
         subwords = subwords[::-1]
 
         subwords.append(
-            LexItem(
+            make_lex_item(
                 lang=self.lang,
                 lemma=head_lemma,
                 form=head_lemma,
@@ -211,7 +221,7 @@ class GermaNetReader(AnalysesReaderAbstract):
             )
         )
 
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             lemma=derived_lemma,
             form=derived_lemma,
@@ -0,0 +1,79 @@
+import multiprocessing
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src import Inventory, unite_inventories
+from data_readers.abstract_readers import ReaderAbstract
+
+
+# (reader, path, build_inventory kwargs)
+SourceSpec = Tuple[ReaderAbstract, str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class SourceReport:
+    reader: str
+    path: str
+    seconds: float
+    n_rules: int
+    n_analyses: int
+    n_trees: int
+
+    def __str__(self):
+        return (
+            f"{self.reader}\t{self.path}\t{self.seconds:.2f}s\t"
+            f"rules={self.n_rules}\tanalyses={self.n_analyses}\t"
+            f"trees={self.n_trees}"
+        )
+
+
+def build_inventories(
+        specs: Sequence[SourceSpec],
+        n_workers: Optional[int] = None,
+        lazy: bool = True
+) -> Tuple[Inventory, List[SourceReport]]:
+    """
+    Runs `build_inventory` of several sources concurrently
+    and unites the results. The precedence does not depend on timing:
+    as in `unite_inventories`, for equal keys the later specs win.
+
+    inventory, report = build_inventories([
+        (GermaNetReader("deu"), "germanet.txt", {}),
+        (UDerReader("deu"), "derivbase.tsv", {"rules_path": "rules.json"}),
+    ], n_workers=2)
+    print("\\n".join(map(str, report)))
+    """
+    if not specs:
+        raise ValueError("No sources to build the inventories from!")
+    n_workers = n_workers or min(len(specs), multiprocessing.cpu_count())
+    if n_workers <= 1 or len(specs) <= 1:
+        results = [_build_source(spec) for spec in specs]
+    else:
+        with multiprocessing.Pool(n_workers) as pool:
+            # the results are collected in the order of the specs
+            results = pool.map(_build_source, specs, chunksize=1)
+
+    inventories = []
+    report = []
+    for (reader, path, _), (inventory, seconds) in zip(specs, results):
+        inventories.append(inventory)
+        report.append(SourceReport(
+            reader=type(reader).__name__,
+            path=path,
+            seconds=seconds,
+            n_rules=len(inventory.rules_by_ids),
+            n_analyses=len(inventory.word_analyses),
+            n_trees=len(inventory.word_trees)
+        ))
+    return unite_inventories(*inventories, lazy=lazy), report
+
+
+def _build_source(spec: SourceSpec) -> Tuple[Inventory, float]:
+    reader, path, kwargs = spec
+    if multiprocessing.current_process().daemon:
+        # pool workers cannot start pools of their own
+        reader.n_workers = 1
+    start = time.perf_counter()
+    inventory = reader.build_inventory(path, **kwargs)
+    return inventory, time.perf_counter() - start
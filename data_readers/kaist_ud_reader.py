@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple, Any
+from typing import Any, Iterator, List, Tuple
 
 from src import (
     LexItem,
@@ -145,7 +145,7 @@ class KaistUDTReader(ReaderAbstract):
     def build_inventory(self, *args, **kwargs) -> Inventory:
         raise NotImplementedError
 
-    def read_dataset(self, *args, **kwargs) -> Dict[LexItem, Any]:
+    def iter_dataset(self, *args, **kwargs) -> Iterator[Tuple[LexItem, Any]]:
         raise NotImplementedError
 
     def read_sample(self, *args, **kwargs) -> Tuple[LexItem, Any]:
@@ -1,8 +1,8 @@
 import pandas as pd
-from typing import Dict, Tuple, List
+from typing import Iterable, Iterator, List, MutableMapping, Optional, Tuple
 
 from src import (
-    LexItem, WFToken,
+    LexItem, make_lex_item, WFToken,
     RuleInfo,
     Inventory
 )
@@ -23,6 +23,8 @@ class MorphyNetDerivationalReader(AnalysesReaderAbstract):
 
     https://github.com/kbatsuren/MorphyNet
     """
+    RECORD_FORMAT = "line"
+
     POS2UPOS = {
         "V": "VERB",
         "J": "ADJ",
@@ -39,44 +41,45 @@ class MorphyNetDerivationalReader(AnalysesReaderAbstract):
             self,
             path: str,
             bracketing_strategy: str = "last",
+            word_analyses: Optional[MutableMapping] = None,
             **kwargs
     ) -> Inventory:
-        derivations_analyses = self.read_dataset(path)
         rules_by_ids = {}
-        for k, v in derivations_analyses.items():
-            rule_id = v.rule_id  # 'suffix:(-ish)(NOUN) -> ADJ'
-            pattern = rule_id[rule_id.find("(")+1:rule_id.find(")")]
-            pattern = pattern.replace("X", "-")
-            process = rule_id[:rule_id.find(":")]
-
-            if process in ["prefix", "suffix"]:
-                rule = RuleInfo(
-                    short_id=pattern,
-                    info=self.PROCESS2INFO[process],
-                    pos_b=v.d_from.upos,
-                    pos_a=k.upos
-                )
-            else:
-                raise ValueError(process)
-
-            rules_by_ids[rule_id] = rule
+        word_analyses = self._fill(word_analyses, path, rules_by_ids)
 
         inventory = Inventory(
-            word_analyses=derivations_analyses,
+            word_analyses=word_analyses,
             rules_by_ids=rules_by_ids,
             bracketing_strategy=bracketing_strategy
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, WFToken]:
+    def _make_rule(self, k: LexItem, v: WFToken) -> RuleInfo:
+        rule_id = v.rule_id  # 'suffix:(-ish)(NOUN) -> ADJ'
+        pattern = rule_id[rule_id.find("(")+1:rule_id.find(")")]
+        pattern = pattern.replace("X", "-")
+        process = rule_id[:rule_id.find(":")]
+
+        if process in ["prefix", "suffix"]:
+            rule = RuleInfo(
+                short_id=pattern,
+                info=self.PROCESS2INFO[process],
+                pos_b=v.d_from.upos,
+                pos_a=k.upos
+            )
+        else:
+            raise ValueError(process)
+        return rule
+
+    def iter_dataset(self, path: str) -> Iterator[Tuple[LexItem, WFToken]]:
         with open(path, "r") as f:
-            lines = f.readlines()
-        results = {}
+            yield from self._iter_lines(f)
+
+    def _iter_lines(
+            self, lines: Iterable[str]
+    ) -> Iterator[Tuple[LexItem, WFToken]]:
         for line in lines:
-            analyses = self.read_sample(line.strip())
-            for word, analysis in analyses:
-                results[word] = analysis
-        return results
+            yield from self.read_sample(line.strip())
 
     def read_sample(self, line: str) -> List[Tuple[LexItem, WFToken]]:
         (
@@ -90,7 +93,7 @@ class MorphyNetDerivationalReader(AnalysesReaderAbstract):
         elif process == "prefix":
             affix = f"{affix}-"
 
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             lemma=derived_lemma,
             form=derived_lemma,
@@ -99,7 +102,7 @@ class MorphyNetDerivationalReader(AnalysesReaderAbstract):
         )
 
         analysis = WFToken(
-            d_from=LexItem(
+            d_from=make_lex_item(
                 lang=self.lang,
                 lemma=source_lemma,
                 form=source_lemma,
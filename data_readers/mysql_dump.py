@@ -0,0 +1,161 @@
+import re
+from typing import Collection, Iterator, Optional, TextIO, Tuple, Union
+
+
+INSERT_PREFIX = "INSERT INTO `"
+
+# a whole row; quoted strings may contain any characters
+ROW_RE = re.compile(r"\(((?:'(?:[^'\\]|\\.|'')*'|[^'()])*)\)", re.S)
+FIELD_RE = re.compile(r"\s*('(?:[^'\\]|\\.|'')*'|[^,]*?)\s*(?:,|$)", re.S)
+ESCAPE_RE = re.compile(r"\\(.)|''", re.S)
+ESCAPES = {
+    "0": "\0", "b": "\b", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"
+}
+
+Value = Union[None, int, float, str]
+
+
+def _unescape(match: re.Match) -> str:
+    c = match.group(1)
+    if c is None:
+        return "'"
+    return ESCAPES.get(c, c)
+
+
+def parse_value(token: str) -> Value:
+    if token.startswith("'"):
+        return ESCAPE_RE.sub(_unescape, token[1:-1])
+    if token == "NULL":
+        return None
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+def parse_row(row: str) -> Tuple[Value, ...]:
+    values = []
+    pos = 0
+    while pos < len(row):
+        match = FIELD_RE.match(row, pos)
+        values.append(parse_value(match.group(1)))
+        pos = match.end()
+    return tuple(values)
+
+
+class _Buffer:
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.data = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        Reads the next chunk, dropping the consumed data.
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.data = self.data[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def ensure(self, n: int) -> bool:
+        while len(self.data) - self.pos < n:
+            if not self.fill():
+                return False
+        return True
+
+    def find(self, s: str, keep: bool = True) -> int:
+        """
+        The position of `s` after `pos`, reading more chunks if needed.
+        Unless `keep`, the data before it can be dropped while searching.
+        """
+        start = self.pos
+        while True:
+            i = self.data.find(s, start)
+            if i >= 0:
+                return i
+            # a prefix of `s` may be at the end of the buffer
+            start = max(start, len(self.data) - len(s) + 1)
+            if not keep:
+                self.pos = start
+            shift = self.pos
+            if not self.fill():
+                return -1
+            start -= shift
+
+    def skip_line(self):
+        # mysqldump escapes line breaks in values,
+        # so a statement ends at the end of the line
+        i = self.find("\n", keep=False)
+        self.pos = len(self.data) if i < 0 else i + 1
+
+    def skip_spaces(self) -> Optional[str]:
+        while True:
+            while self.pos < len(self.data) and self.data[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.data):
+                return self.data[self.pos]
+            if not self.fill():
+                return None
+
+
+def iter_insert_rows(
+        f: TextIO,
+        tables: Collection[str],
+        chunk_size: int = 1 << 20
+) -> Iterator[Tuple[str, Tuple[Value, ...]]]:
+    """
+    Yields (table, row) pairs of the `INSERT INTO` statements
+    of a MySQL dump for the given tables only.
+    The dump is read in chunks; other statements are skipped
+    by a search for the line end, without parsing.
+    """
+    buffer = _Buffer(f, chunk_size)
+    while buffer.ensure(len(INSERT_PREFIX)) or buffer.pos < len(buffer.data):
+        if not buffer.data.startswith(INSERT_PREFIX, buffer.pos):
+            buffer.skip_line()
+            continue
+        buffer.pos += len(INSERT_PREFIX)
+        end = buffer.find("`")
+        if end < 0:
+            break
+        table = buffer.data[buffer.pos:end]
+        buffer.pos = end + 1
+        if table not in tables:
+            buffer.skip_line()
+            continue
+
+        # an optional column list precedes the values
+        end = buffer.find("VALUES", keep=False)
+        if end < 0:
+            raise ValueError(f"No values in INSERT INTO `{table}`!")
+        buffer.pos = end + len("VALUES")
+        while True:
+            c = buffer.skip_spaces()
+            if c == ",":
+                buffer.pos += 1
+                continue
+            if c != "(":
+                # ";" or the end of the dump
+                buffer.skip_line()
+                break
+            match = ROW_RE.match(buffer.data, buffer.pos)
+            while match is None:
+                if not buffer.fill():
+                    raise ValueError(
+                        f"Incomplete row in INSERT INTO `{table}`!"
+                    )
+                match = ROW_RE.match(buffer.data, buffer.pos)
+            buffer.pos = match.end()
+            yield table, parse_row(match.group(1))
@@ -1,8 +1,8 @@
 import re
-from typing import Dict, List, Tuple
+from typing import List, Tuple, Iterator, MutableMapping, Optional
 
 from src import (
-    LexItem,
+    LexItem, make_lex_item,
     CONLLUToken, CONLLUTree,
     Inventory
 )
@@ -131,35 +131,34 @@ class PopolucaDeTexistepecReader(ReaderAbstract):
         "rozar": "VERB",
     }
 
-    def build_inventory(self, path: str) -> Inventory:
-        word_trees = self.read_dataset(path)
+    def build_inventory(
+            self,
+            path: str,
+            word_trees: Optional[MutableMapping] = None
+    ) -> Inventory:
+        word_trees = self._fill(word_trees, path)
         inventory = Inventory(
             word_trees=word_trees
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, CONLLUTree]:
+    def iter_dataset(
+            self, path: str
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
         with open(path, "r") as f:
-            lines = f.readlines()
-
-        results = {}
-
-        cur_lines = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                for word, analysis in self.read_sample(cur_lines):
-                    results[word] = analysis
-                cur_lines = []
-                continue
-            if line.startswith("#"):
-                continue
-            cur_lines.append(line)
-        else:
-            if cur_lines:
-                for word, analysis in self.read_sample(cur_lines):
-                    results[word] = analysis
-        return results
+            cur_lines = []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    yield from self.read_sample(cur_lines)
+                    cur_lines = []
+                    continue
+                if line.startswith("#"):
+                    continue
+                cur_lines.append(line)
+            else:
+                if cur_lines:
+                    yield from self.read_sample(cur_lines)
 
     def read_sample(
             self, cur_lines: List[str]
@@ -252,7 +251,7 @@ class PopolucaDeTexistepecReader(ReaderAbstract):
                 subword_tokens.append(morpheme_token)
 
             word_tree = CONLLUTree(subword_tokens)
-            word = LexItem(
+            word = make_lex_item(
                 lang=self.lang,
                 form=surface_token,
                 lemma=segmented_token,
@@ -1,14 +1,14 @@
 import os
 from collections import Counter
-from typing import Dict, Tuple, List
-from xml.etree import ElementTree as ET
+from typing import Iterator, Tuple, List, MutableMapping, Optional
 
 from src import (
-    LexItem,
+    LexItem, make_lex_item,
     CONLLUToken, CONLLUTree,
     Inventory
 )
 from data_readers.abstract_readers import ReaderAbstract
+from data_readers.xml_stream import iter_xml_elements
 
 
 class EvenkiTsakorpusReader(ReaderAbstract):
@@ -19,17 +19,21 @@ class EvenkiTsakorpusReader(ReaderAbstract):
         "adj": "ADJ",
     }
 
-    def build_inventory(self, path: str) -> Inventory:
+    def build_inventory(
+            self,
+            path: str,
+            word_trees: Optional[MutableMapping] = None
+    ) -> Inventory:
         if os.path.isfile(path):
-            word_trees = self.read_dataset(path)
+            word_trees = self._fill(word_trees, path)
         elif os.path.isdir(path):
-            word_trees = {}
+            if word_trees is None:
+                word_trees = {}
             for fname in os.listdir(path):
                 fpath = os.path.join(path, fname)
                 if not fpath.endswith(".eaf"):
                     continue
-                word_trees_fpath = self.read_dataset(fpath)
-                word_trees.update(word_trees_fpath)
+                self._fill(word_trees, fpath)
         else:
             raise ValueError
         inventory = Inventory(
@@ -37,10 +41,11 @@ class EvenkiTsakorpusReader(ReaderAbstract):
         )
         return inventory
 
-    def read_dataset(self, path: str) -> Dict[LexItem, CONLLUTree]:
-        xml = ET.parse(path)
-        results = {}
-
+    def iter_dataset(
+            self, path: str
+    ) -> Iterator[Tuple[LexItem, CONLLUTree]]:
+        # The tiers refer to each other, so only the references are kept
+        # while the annotations are streamed one by one.
         by_morph = {
             "gl": {},
             "morph_msa": {},
@@ -53,62 +58,62 @@ class EvenkiTsakorpusReader(ReaderAbstract):
         sentences = []
         cur_sentence = []
 
-        for elem in xml.getroot():
+        last_tier = None
+        # TIER/ANNOTATION elements
+        for ancestors, token in iter_xml_elements(path, depth=2):
+            elem = ancestors[1]
+            if elem is not last_tier:
+                # the sentence ends with its tier
+                if cur_sentence:
+                    sentences.append(cur_sentence)
+                    cur_sentence = []
+                last_tier = elem
             if elem.tag != "TIER":
                 continue
             tier_id = elem.attrib["TIER_ID"]
             if tier_id in by_morph:
-                for token in elem:
-                    for ann in token:
-                        ref = ann.attrib["ANNOTATION_REF"]
-                        for refann in ann:
-                            by_morph[tier_id][ref] = refann.text
+                for ann in token:
+                    ref = ann.attrib["ANNOTATION_REF"]
+                    for refann in ann:
+                        by_morph[tier_id][ref] = refann.text
             elif tier_id == "fon":
-                for token in elem:
-                    for ann in token:
-                        ref = ann.attrib["ANNOTATION_REF"]
-                        annid = ann.attrib["ANNOTATION_ID"]
-                        if ref not in morphs_by_word:
-                            morphs_by_word[ref] = []
-                        for refann in ann:
-                            morphs_by_word[ref].append((annid, refann.text))
+                for ann in token:
+                    ref = ann.attrib["ANNOTATION_REF"]
+                    annid = ann.attrib["ANNOTATION_ID"]
+                    if ref not in morphs_by_word:
+                        morphs_by_word[ref] = []
+                    for refann in ann:
+                        morphs_by_word[ref].append((annid, refann.text))
             elif tier_id == "word_pos":
-                for token in elem:
-                    for ann in token:
-                        ref = ann.attrib["ANNOTATION_REF"]
-                        for refann in ann:
-                            pos_by_word[ref] = refann.text
+                for ann in token:
+                    ref = ann.attrib["ANNOTATION_REF"]
+                    for refann in ann:
+                        pos_by_word[ref] = refann.text
             elif tier_id == "fonWord":
-                for token in elem:
-                    for ann in token:
-                        annid = ann.attrib["ANNOTATION_ID"]
-                        prev_ann = ann.attrib.get("PREVIOUS_ANNOTATION")
-                        for refann in ann:
-                            annid_to_word[annid] = refann.text
-                            if prev_ann:
-                                cur_sentence.append(annid)
-                            else:
-                                if cur_sentence:
-                                    sentences.append(cur_sentence)
-                                    cur_sentence = []
-                else:
-                    if cur_sentence:
-                        sentences.append(cur_sentence)
-                        cur_sentence = []
+                for ann in token:
+                    annid = ann.attrib["ANNOTATION_ID"]
+                    prev_ann = ann.attrib.get("PREVIOUS_ANNOTATION")
+                    for refann in ann:
+                        annid_to_word[annid] = refann.text
+                        if prev_ann:
+                            cur_sentence.append(annid)
+                        else:
+                            if cur_sentence:
+                                sentences.append(cur_sentence)
+                                cur_sentence = []
+        if cur_sentence:
+            sentences.append(cur_sentence)
 
         for sentence in sentences:
             # ['a25', 'a26', 'a27', 'a28', 'a29', 'a30', 'a31']
             for token_id in sentence:
-                for word, analysis in self.read_sample(
+                yield from self.read_sample(
                     token_id=token_id,
                     by_morph=by_morph,
                     morphs_by_word=morphs_by_word,
                     annid_to_word=annid_to_word,
                     pos_by_word=pos_by_word
-                ):
-                    results[word] = analysis
-
-        return results
+                )
 
     def read_sample(
             self,
@@ -168,7 +173,7 @@ class EvenkiTsakorpusReader(ReaderAbstract):
             )
             subword_tokens.append(morpheme_token)
         word_tree = CONLLUTree(subword_tokens)
-        word = LexItem(
+        word = make_lex_item(
             lang=self.lang,
             lemma=token,
             form=token,
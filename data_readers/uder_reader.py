@@ -1,9 +1,12 @@
 import json
-from typing import Dict, List, Tuple, Optional
+from collections import defaultdict
+from typing import (
+    Dict, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple
+)
 
 from data_readers.abstract_readers import AnalysesReaderAbstract
 from src import (
-    LexItem, WFToken,
+    LexItem, make_lex_item, WFToken,
     RuleInfo, ComplexRuleInfo, CompoundRuleInfo,
     Inventory
 )
@@ -30,42 +33,178 @@ class UDerReader(AnalysesReaderAbstract):
             path: str,
             rules_path: Optional[str] = None,
             bracketing_strategy: str = "last",
+            word_analyses: Optional[MutableMapping] = None,
             **kwargs
     ) -> Inventory:
-        uder_analyses = self.read_dataset(path)
+        word_analyses = self._fill(word_analyses, path)
         if rules_path is not None:
             rules = self.read_rules(rules_path)
         else:
             rules = None
 
         inventory = Inventory(
-            word_analyses=uder_analyses,
+            word_analyses=word_analyses,
             rules_by_ids=rules,
             bracketing_strategy=bracketing_strategy
         )
         return inventory
 
-    def read_dataset(
-            self, path: str,
-    ) -> Dict[LexItem, WFToken]:
+    def iter_dataset(
+            self, path: str, n_workers: Optional[int] = None
+    ) -> Iterator[Tuple[LexItem, WFToken]]:
+        """
+        Reads the file in a single pass, one derivational family
+        (the records with the same id prefix, e. g. "220654.") at a time.
+        The parents are resolved inside the family; the records which
+        refer to other families (e. g. compounding sources) are deferred
+        and resolved at the end by a lookup of the missing ids only.
+
+        So the deferred records are yielded after all the others,
+        not in file order; for repeated words the last record
+        in the file still wins, as a deferred record is dropped
+        if a later record of the same word has been yielded.
+        """
+        n_workers = n_workers or self.n_workers
+        deferred = []
+        # derived word -> indices of its deferred records
+        deferred_by_word = defaultdict(list)
+        superseded = set()
         with open(path, "r") as f:
-            lines = f.readlines()
+            blocks = self._iter_family_blocks(f)
+            if n_workers <= 1:
+                results = map(self._read_family_block, blocks)
+            else:
+                results = self._map_ordered(
+                    "_read_family_blocks",
+                    ((batch,) for batch in self._iter_batches(blocks)),
+                    n_workers
+                )
+            for analyses, deferred_block in results:
+                for word, analysis in analyses:
+                    if word in deferred_by_word:
+                        superseded.update(deferred_by_word.pop(word))
+                    yield word, analysis
+                for record in deferred_block:
+                    deferred_by_word[record[3]].append(len(deferred))
+                    deferred.append(record)
 
-        results = {}
-        id_to_lemma = self._read_id_to_lemma(lines)
+        deferred = [
+            record for i, record in enumerate(deferred)
+            if i not in superseded
+        ]
+        if not deferred:
+            return
+        missing_ids = set()
+        for line, missing, id_to_lemma, word in deferred:
+            missing_ids.update(missing)
+        with open(path, "r") as f:
+            found = self._read_id_to_lemma(f, missing_ids)
+        for line, missing, id_to_lemma, word in deferred:
+            for lid in missing:
+                if lid in found:
+                    id_to_lemma[lid] = found[lid]
+            try:
+                yield from self.read_sample(line, id_to_lemma)
+            except KeyError:
+                # the referenced ids are not in the dataset
+                continue
 
+    @staticmethod
+    def _iter_family_blocks(lines: Iterable[str]) -> Iterator[List[str]]:
+        block = []
+        family = None
         for line in lines:
             line = line.strip()
             if not line:
                 continue
+            line_family = line[:line.find(".")]
+            if block and line_family != family:
+                yield block
+                block = []
+            family = line_family
+            block.append(line)
+        if block:
+            yield block
+
+    def _iter_batches(
+            self, blocks: Iterable[List[str]]
+    ) -> Iterator[List[List[str]]]:
+        # blocks of about `chunk_bytes` per task
+        batch = []
+        size = 0
+        for block in blocks:
+            batch.append(block)
+            size += sum(len(line) for line in block)
+            if size >= self.chunk_bytes:
+                yield batch
+                batch = []
+                size = 0
+        if batch:
+            yield batch
+
+    def _read_family_blocks(
+            self, blocks: List[List[str]]
+    ) -> Tuple[List[Tuple[LexItem, WFToken]], list]:
+        analyses = []
+        deferred = []
+        for block in blocks:
+            analyses_block, deferred_block = self._read_family_block(block)
+            analyses.extend(analyses_block)
+            deferred.extend(deferred_block)
+        return analyses, deferred
+
+    def _read_family_block(
+            self, lines: List[str]
+    ) -> Tuple[List[Tuple[LexItem, WFToken]], list]:
+        """
+        Returns the analyses of the family and the deferred records
+        as (line, missing ids, resolved ids, derived word) tuples.
+        """
+        id_to_lemma = self._read_id_to_lemma(lines)
+        analyses = []
+        deferred = []
+        for line in lines:
             try:
-                analyses = self.read_sample(line, id_to_lemma)
+                references = self._read_references(line)
+                if not references:
+                    # the root of the family
+                    continue
+                missing = [
+                    lid for lid in references if lid not in id_to_lemma
+                ]
+                if missing:
+                    resolved = {
+                        lid: id_to_lemma[lid]
+                        for lid in references if lid in id_to_lemma
+                    }
+                    _, _, lemma, pos = line.split("\t", 4)[:4]
+                    word = self._make_word(lemma, pos)
+                    deferred.append((line, missing, resolved, word))
+                    continue
+                line_analyses = self.read_sample(line, id_to_lemma)
             except KeyError:
-                # id_to_lemma has no key "" for the root of the tree
+                # e. g. no Rule or Sources in the record
                 continue
-            for word, analysis in analyses:
-                results[word] = analysis
-        return results
+            if deferred:
+                # the later records of the same words win
+                words = {word for word, _ in line_analyses}
+                deferred = [d for d in deferred if d[3] not in words]
+            analyses.extend(line_analyses)
+        return analyses, deferred
+
+    def _read_references(self, line: str) -> List[str]:
+        """
+        The ids which `read_sample` looks up for the line.
+        """
+        (
+            lid, lemmapos, lemma, pos, _, _, par, wf_meta, _, _
+        ) = line.split("\t")
+        if not par:
+            return []
+        wf_info = self._read_wf_meta(wf_meta)
+        if wf_info.get("Type", "Derivation") == "Compounding":
+            return [par] + [s for s in wf_info["Sources"] if s != par]
+        return [par]
 
     def read_sample(
             self, line: str, id_to_lemma: Dict[str, LexItem]
@@ -82,12 +221,7 @@ class UDerReader(AnalysesReaderAbstract):
             modifiers = [id_to_lemma[s] for s in source_ids if s != par]
         else:
             modifiers = None
-        derived_word = LexItem(
-            lang=self.lang,
-            lemma=lemma,
-            form=lemma,
-            upos=pos
-        )
+        derived_word = self._make_word(lemma, pos)
         analysis = WFToken(
             d_from=head,
             rule_id=rule_id,
@@ -95,21 +229,28 @@ class UDerReader(AnalysesReaderAbstract):
         )
         return [(derived_word, analysis)]
 
-    def _read_id_to_lemma(self, lines: List[str]) -> Dict[str, LexItem]:
+    def _read_id_to_lemma(
+            self, lines: Iterable[str], ids: Optional[Set[str]] = None
+    ) -> Dict[str, LexItem]:
         id_to_lemma = {}
         for line in lines:
             line = line.strip()
             if not line:
                 continue
+            if ids is not None and line[:line.find("\t")] not in ids:
+                continue
             lid, lemmapos, lemma, pos, _, _, _, _, _, _ = line.split("\t")
-            id_to_lemma[lid] = LexItem(
-                lang=self.lang,
-                lemma=lemma,
-                form=lemma,
-                upos=pos
-            )
+            id_to_lemma[lid] = self._make_word(lemma, pos)
         return id_to_lemma
 
+    def _make_word(self, lemma: str, pos: str) -> LexItem:
+        return make_lex_item(
+            lang=self.lang,
+            lemma=lemma,
+            form=lemma,
+            upos=pos
+        )
+
     @staticmethod
     def _read_wf_meta(wf_meta: str):
         wf_info = {}
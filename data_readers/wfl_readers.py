@@ -1,14 +1,15 @@
 from abc import ABC
-from ast import literal_eval
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Iterator, MutableMapping, Optional
 from xml.etree import ElementTree as ET
 
 from src import (
-    LexItem, WFToken,
+    LexItem, make_lex_item, WFToken,
     RuleInfo,
     Inventory
 )
 from data_readers.abstract_readers import AnalysesReaderAbstract
+from data_readers.mysql_dump import iter_insert_rows
+from data_readers.xml_stream import iter_xml_elements
 
 
 class WordFormationLatinReaderAbstract(AnalysesReaderAbstract, ABC):
@@ -33,45 +34,44 @@ class WordFormationLatinReaderAbstract(AnalysesReaderAbstract, ABC):
             self,
             path: str,
             bracketing_strategy: str = "last",
+            word_analyses: Optional[MutableMapping] = None,
             **kwargs
     ) -> Inventory:
-        derivations_analyses = self.read_dataset(path)
         rules_by_ids = {}
-        for k, v in derivations_analyses.items():
-            rule_parts = v.rule_id.split(":")
-            if len(rule_parts) == 3:
-                rule_id, process, category = rule_parts
-                if process == "Derivation_Conversion":
-                    rule = RuleInfo(
-                        short_id="_",
-                        info=self.PROCESS2INFO[process],
-                        pos_b=v.d_from.upos,
-                        pos_a=k.upos
-                    )
-                    rules_by_ids[v.rule_id] = rule
-                else:
-                    # TODO: compounding rules;
-                    #  without them the default method is used
-                    pass
-            elif len(rule_parts) == 4:
-                rule_id, process, category, affix = rule_parts
-                rule = RuleInfo(
-                    short_id=affix,
-                    info=self.PROCESS2INFO[process],
-                    pos_b=v.d_from.upos,
-                    pos_a=k.upos
-                )
-                rules_by_ids[v.rule_id] = rule
-            else:
-                raise ValueError
+        word_analyses = self._fill(word_analyses, path, rules_by_ids)
 
         inventory = Inventory(
-            word_analyses=derivations_analyses,
+            word_analyses=word_analyses,
             rules_by_ids=rules_by_ids,
             bracketing_strategy=bracketing_strategy
         )
         return inventory
 
+    def _make_rule(self, k: LexItem, v: WFToken) -> Optional[RuleInfo]:
+        rule_parts = v.rule_id.split(":")
+        if len(rule_parts) == 3:
+            rule_id, process, category = rule_parts
+            if process == "Derivation_Conversion":
+                return RuleInfo(
+                    short_id="_",
+                    info=self.PROCESS2INFO[process],
+                    pos_b=v.d_from.upos,
+                    pos_a=k.upos
+                )
+            # TODO: compounding rules;
+            #  without them the default method is used
+            return None
+        elif len(rule_parts) == 4:
+            rule_id, process, category, affix = rule_parts
+            return RuleInfo(
+                short_id=affix,
+                info=self.PROCESS2INFO[process],
+                pos_b=v.d_from.upos,
+                pos_a=k.upos
+            )
+        else:
+            raise ValueError
+
 
 class WordFormationLatinSQLReader(WordFormationLatinReaderAbstract):
     """
@@ -83,46 +83,36 @@ class WordFormationLatinSQLReader(WordFormationLatinReaderAbstract):
     https://github.com/CIRCSE/LEMLAT3
     """
 
-    LEMMAS_PREFIX = "INSERT INTO `lemmario` VALUES"
-    WFR_PREFIX = "INSERT INTO `lemmas_wfr` VALUES"
+    LEMMAS_TABLE = "lemmario"
+    WFR_TABLE = "lemmas_wfr"
 
-    def read_dataset(self, path: str) -> Dict[LexItem, WFToken]:
-        # First read all lemmas and relations.
-        lemmas = []
+    def iter_dataset(self, path: str) -> Iterator[Tuple[LexItem, WFToken]]:
+        # First read all lemmas and relations;
+        # the other tables of the dump are skipped.
+        lemmas_by_ids = {}
         wfrs = []
         with open(path, "r") as f:
-            lines = f.readlines()
-        for line in lines:
-            for prefix, data in [
-                (self.LEMMAS_PREFIX, lemmas),
-                (self.WFR_PREFIX, wfrs)
-            ]:
-                if line.startswith(prefix):
-                    line = line[len(prefix):]
-                    line = "".join(line.split()).replace("NULL", "None")
-                    if line.endswith(";"):
-                        line = line[:-1]
-                    new_data = literal_eval(f"[{line}]")
-                    data.extend(new_data)
-
-        # Make lemmas.
-        lemmas_by_ids = {}
-        for lemma_record in lemmas:
-            (
-                id_lemma, lemma, codlem, gen, codmorf,
-                n_id, lemma_reduced, upostag, upostag_2, src
-            ) = lemma_record
-            lemmas_by_ids[id_lemma] = LexItem(
-                lang=self.lang,
-                lemma=lemma,
-                form=lemma,
-                upos=upostag,
-                lid=id_lemma  # to distinguish conversion within the same POS
-            )
+            for table, row in iter_insert_rows(
+                f, (self.LEMMAS_TABLE, self.WFR_TABLE)
+            ):
+                if table == self.WFR_TABLE:
+                    wfrs.append(row)
+                    continue
+                (
+                    id_lemma, lemma, codlem, gen, codmorf,
+                    n_id, lemma_reduced, upostag, upostag_2, src
+                ) = row
+                lemmas_by_ids[id_lemma] = make_lex_item(
+                    lang=self.lang,
+                    lemma=lemma,
+                    form=lemma,
+                    upos=upostag,
+                    # to distinguish conversion within the same POS
+                    lid=id_lemma
+                )
 
         # Make analyses. As for compounding there are multiple relations,
         # we need to collect them all first.
-        results = {}
         compound_parents: Dict[LexItem, Dict[int, LexItem]] = {}
         compound_rules: Dict[LexItem, str] = {}
 
@@ -152,7 +142,7 @@ class WordFormationLatinSQLReader(WordFormationLatinReaderAbstract):
                 d_from=parent,
                 rule_id=rule_id
             )
-            results[word] = analysis
+            yield word, analysis
 
         # resolve compounding order
         for word in compound_parents:
@@ -166,9 +156,7 @@ class WordFormationLatinSQLReader(WordFormationLatinReaderAbstract):
                 rule_id=compound_rules[word],
                 d_modifiers=parents[:-1]
             )
-            results[word] = analysis
-
-        return results
+            yield word, analysis
 
     def read_sample(
             self, wfr: tuple, lemmas_by_ids: Dict[int, LexItem]
@@ -182,14 +170,9 @@ class WordFormationLatinXMLReader(WordFormationLatinReaderAbstract):
 
     https://github.com/CIRCSE/WFL
     """
-    def read_dataset(self, path: str) -> Dict[LexItem, WFToken]:
-        xml = ET.parse(path)
-        results = {}
-        for record in xml.getroot():
-            analyses = self.read_sample(record)
-            for word, analysis in analyses:
-                results[word] = analysis
-        return results
+    def iter_dataset(self, path: str) -> Iterator[Tuple[LexItem, WFToken]]:
+        for _, record in iter_xml_elements(path, depth=1):
+            yield from self.read_sample(record)
 
     def read_sample(self, record: ET) -> List[Tuple[LexItem, WFToken]]:
         analyses = []
@@ -224,21 +207,21 @@ class WordFormationLatinXMLReader(WordFormationLatinReaderAbstract):
                             xpos_l, xpos_r, xpos_d = rule_category.replace("=", "+").split("+")
                             # TODO: dependency arc direction
                             lemma_l, lemma_r = source_lemmas
-                            word = LexItem(
+                            word = make_lex_item(
                                 lang=self.lang,
                                 lemma=lemma,
                                 form=lemma,
                                 upos=self.POS2UPOS[xpos_d],
                                 xpos=xpos_d,
                             )
-                            subword_l = LexItem(
+                            subword_l = make_lex_item(
                                 lang=self.lang,
                                 lemma=lemma_l,
                                 form=lemma_l,
                                 upos=self.POS2UPOS[xpos_l],
                                 xpos=xpos_l,
                             )
-                            subword_r = LexItem(
+                            subword_r = make_lex_item(
                                 lang=self.lang,
                                 lemma=lemma_r,
                                 form=lemma_r,
@@ -255,7 +238,7 @@ class WordFormationLatinXMLReader(WordFormationLatinReaderAbstract):
 
                         xpos_s, _, xpos_d = rule_category.split("-")
 
-                        word = LexItem(
+                        word = make_lex_item(
                             lang=self.lang,
                             lemma=lemma,
                             form=lemma,
@@ -266,7 +249,7 @@ class WordFormationLatinXMLReader(WordFormationLatinReaderAbstract):
                             for sl in rule:
                                 source_lemma = sl.attrib["lemma"]
                                 analysis = WFToken(
-                                    d_from=LexItem(
+                                    d_from=make_lex_item(
                                         lang=self.lang,
                                         lemma=source_lemma,
                                         form=source_lemma,
@@ -283,7 +266,7 @@ class WordFormationLatinXMLReader(WordFormationLatinReaderAbstract):
                         for sl in rule:
                             source_lemma = sl.attrib["lemma"]
                             analysis = WFToken(
-                                d_from=LexItem(
+                                d_from=make_lex_item(
                                     lang=self.lang,
                                     lemma=source_lemma,
                                     form=source_lemma,
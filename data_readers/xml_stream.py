@@ -0,0 +1,25 @@
+from typing import Iterator, List, Tuple
+from xml.etree import ElementTree as ET
+
+
+def iter_xml_elements(
+        path: str, depth: int
+) -> Iterator[Tuple[List[ET.Element], ET.Element]]:
+    """
+    Yields the elements at the given depth (the root is at depth 0)
+    together with their ancestors, as soon as each one is parsed.
+    After it is processed, an element is cleared and detached from its
+    parent, so memory is bounded by one element instead of the document.
+    """
+    ancestors = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            ancestors.append(elem)
+            continue
+        ancestors.pop()
+        if len(ancestors) != depth:
+            continue
+        yield ancestors, elem
+        elem.clear()
+        if ancestors:
+            ancestors[-1].remove(elem)
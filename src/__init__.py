@@ -1,7 +1,14 @@
 from src.deptree import (
-    LexItem,
+    LexItem, make_lex_item,
     WFToken,
     RuleInfo, ComplexRuleInfo, CompoundRuleInfo,
-    CONLLUToken, CONLLUTree,
-    Inventory, unite_inventories
+    CONLLUToken, CONLLUTree, CONLLUTreeBuilder,
+    Inventory, unite_inventories,
+    iter_conllu_texts
 )
+from src.columnar import (
+    CONLLUTokenView, ColumnarCONLLUTree
+)
+from src.bloom import BloomFilter
+from src.tree_store import TreeStore
+from src.sqlite_store import SQLiteInventoryStore
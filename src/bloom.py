@@ -0,0 +1,78 @@
+import math
+import struct
+from hashlib import blake2b
+from typing import Iterable, List
+
+
+HEADER = struct.Struct("<QQ")
+
+
+class BloomFilter:
+    """
+    A compact set of strings for negative lookups:
+    `value in bloom_filter` is False only for the values never added,
+    and True for the others with a false positive rate of about
+    `error_rate` while at most `capacity` values are added.
+
+    The positions are derived from blake2b, not from the built-in hash,
+    so a saved filter is valid in other processes and runs.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError(f"Incorrect error rate {error_rate}!")
+        capacity = max(capacity, 1)
+        self.n_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+
+    @classmethod
+    def from_values(
+            cls, values: Iterable[str], error_rate: float = 0.01
+    ) -> "BloomFilter":
+        values = set(values)
+        bloom_filter = cls(len(values), error_rate)
+        for value in values:
+            bloom_filter.add(value)
+        return bloom_filter
+
+    def _positions(self, value: str) -> List[int]:
+        # double hashing: h1 + i * h2
+        digest = blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, value: str):
+        for i in self._positions(value):
+            self.bits[i >> 3] |= 1 << (i & 7)
+
+    def __contains__(self, value: str) -> bool:
+        bits = self.bits
+        for i in self._positions(value):
+            if not bits[i >> 3] & (1 << (i & 7)):
+                return False
+        return True
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(self.n_bits, self.n_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.n_bits, bloom_filter.n_hashes = \
+            HEADER.unpack_from(data)
+        bloom_filter.bits = bytearray(data[HEADER.size:])
+        if len(bloom_filter.bits) != (bloom_filter.n_bits + 7) // 8:
+            raise ValueError("Broken Bloom filter data!")
+        return bloom_filter
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
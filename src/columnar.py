@@ -0,0 +1,291 @@
+from array import array
+from sys import intern
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.deptree import CONLLUToken, CONLLUTree
+
+
+STR_COLUMNS = (
+    "form", "lemma", "upos", "xpos", "feats", "deprel", "deps", "misc"
+)
+
+
+def _add_offset(column: array, offset: int) -> array:
+    # a single pass in C instead of a Python loop over the tokens
+    if not offset:
+        return array("i", column)
+    return array("i", map(offset.__add__, column))
+
+
+def _add_head_offset(column: array, offset: int, root_idx: int) -> array:
+    # the root head stays 0
+    heads = _add_offset(column, offset)
+    if offset:
+        if column.count(0) == 1 and column[root_idx] == 0:
+            heads[root_idx] = 0
+        else:
+            heads = array("i", [h + offset if h > 0 else 0 for h in column])
+    return heads
+
+
+class CONLLUTokenView:
+    """
+    A lightweight view of a single token of a `ColumnarCONLLUTree`.
+    It mimics the `CONLLUToken` interface;
+    reads and writes go straight to the tree columns.
+    """
+    __slots__ = ("_tree", "_i")
+
+    def __init__(self, tree: "ColumnarCONLLUTree", i: int):
+        self._tree = tree
+        self._i = i
+
+    @property
+    def iidx(self) -> int:
+        return self._tree.idx_column[self._i]
+
+    @property
+    def ihead(self) -> int:
+        return self._tree.head_column[self._i]
+
+    @property
+    def idx(self) -> str:
+        return str(self.iidx)
+
+    @property
+    def head(self) -> str:
+        return str(self.ihead)
+
+    def set_idx(self, idx: Union[str, int]):
+        self._tree.idx_column[self._i] = int(idx)
+
+    def set_head(self, head: Union[str, int]):
+        self._tree.head_column[self._i] = int(head)
+
+    def to_token(self) -> CONLLUToken:
+        return CONLLUToken(
+            self.idx, self.form, self.lemma, self.upos, self.xpos,
+            self.feats, self.head, self.deprel, self.deps, self.misc
+        )
+
+    def __copy__(self) -> CONLLUToken:
+        # a copy must not write to the columns of the source tree,
+        # e. g. in `CONLLUTreeBuilder.build`
+        return self.to_token()
+
+    def __str__(self):
+        return "\t".join([
+            self.idx, self.form, self.lemma, self.upos, self.xpos,
+            self.feats, self.head, self.deprel, self.deps, self.misc
+        ])
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _make_str_property(name: str) -> property:
+    def getter(self):
+        return self._tree.str_columns[name][self._i]
+
+    def setter(self, value: str):
+        self._tree.str_columns[name][self._i] = intern(value)
+
+    return property(getter, setter)
+
+
+for _name in STR_COLUMNS:
+    setattr(CONLLUTokenView, _name, _make_str_property(_name))
+
+
+class ColumnarCONLLUTree:
+    """
+    An array-backed alternative to `CONLLUTree`.
+
+    Token ids and heads are stored in two parallel `array('i')` columns,
+    the other fields are stored as lists of interned strings.
+    Renumbering a tree is an offset add over the int columns
+    instead of `set_idx`/`set_head` calls per token.
+
+    Columnar trees stored in `Inventory.word_trees` stay columnar:
+    `Inventory.merge_trees`, `CONLLUTreeBuilder.build` (rule application)
+    and `make_tree` join them by `concat`, which makes new columns,
+    so the stored trees are never modified.
+    """
+    def __init__(
+            self,
+            idx_column: array,
+            head_column: array,
+            str_columns: Dict[str, List[str]],
+            sent_id: str = "",
+            sent_text: Optional[str] = None,
+            root_idx: Optional[int] = None,
+            comments: Sequence[str] = ()
+    ):
+        self.idx_column = idx_column
+        self.head_column = head_column
+        self.str_columns = str_columns
+
+        if root_idx is not None:
+            self.root_idx = int(root_idx)
+        else:
+            for i, head in enumerate(head_column):
+                if head == 0:
+                    self.root_idx = i
+
+        self.sent_id = sent_id
+        self.sent_text = sent_text or " ".join(str_columns["form"])
+        self.comments = list(comments)
+
+    @classmethod
+    def from_tokens(
+            cls,
+            tokens: Iterable[Union[CONLLUToken, CONLLUTokenView]],
+            sent_id: str = "",
+            sent_text: Optional[str] = None,
+            root_idx: Optional[int] = None,
+            comments: Sequence[str] = ()
+    ) -> "ColumnarCONLLUTree":
+        idx_column = array("i")
+        head_column = array("i")
+        str_columns = {name: [] for name in STR_COLUMNS}
+        for token in tokens:
+            idx_column.append(token.iidx)
+            head_column.append(token.ihead)
+            for name in STR_COLUMNS:
+                str_columns[name].append(intern(getattr(token, name)))
+        return cls(
+            idx_column, head_column, str_columns,
+            sent_id=sent_id, sent_text=sent_text, root_idx=root_idx,
+            comments=comments
+        )
+
+    @classmethod
+    def from_tree(cls, tree: CONLLUTree) -> "ColumnarCONLLUTree":
+        return cls.from_tokens(
+            tree.tokens,
+            sent_id=tree.sent_id,
+            sent_text=tree.sent_text,
+            root_idx=tree.root_idx,
+            comments=tree.comments
+        )
+
+    @classmethod
+    def from_text(cls, text: str) -> "ColumnarCONLLUTree":
+        return cls.from_tree(CONLLUTree.from_text(text))
+
+    def to_tree(self) -> CONLLUTree:
+        return CONLLUTree(
+            [token.to_token() for token in self.tokens],
+            sent_id=self.sent_id,
+            sent_text=self.sent_text,
+            root_idx=self.root_idx,
+            comments=self.comments
+        )
+
+    def copy(self) -> "ColumnarCONLLUTree":
+        return ColumnarCONLLUTree(
+            array("i", self.idx_column),
+            array("i", self.head_column),
+            {name: list(c) for name, c in self.str_columns.items()},
+            sent_id=self.sent_id,
+            sent_text=self.sent_text,
+            root_idx=self.root_idx,
+            comments=self.comments
+        )
+
+    @classmethod
+    def concat(
+            cls,
+            trees: Sequence[Union[CONLLUTree, "ColumnarCONLLUTree"]],
+            arcs: Iterable[Tuple[int, int, str]] = (),
+            root_idx: Optional[int] = None,
+            sent_id: str = "",
+            sent_text: Optional[str] = None,
+            comments: Sequence[str] = ()
+    ) -> "ColumnarCONLLUTree":
+        """
+        Joins the trees one after another and renumbers their tokens.
+        Then every (token, head token, deprel) arc of token positions
+        is attached; the head position -1 makes the token a root.
+        """
+        idx_column = array("i")
+        head_column = array("i")
+        str_columns = {name: [] for name in STR_COLUMNS}
+        offset = 0
+        for tree in trees:
+            if isinstance(tree, CONLLUTree):
+                tree = cls.from_tree(tree)
+            idx_column.extend(_add_offset(tree.idx_column, offset))
+            head_column.extend(
+                _add_head_offset(tree.head_column, offset, tree.root_idx)
+            )
+            for name in STR_COLUMNS:
+                str_columns[name].extend(tree.str_columns[name])
+            offset += len(tree)
+
+        deprels = str_columns["deprel"]
+        for i, head_i, deprel in arcs:
+            head_column[i] = idx_column[head_i] if head_i >= 0 else 0
+            deprels[i] = intern(deprel)
+        return cls(
+            idx_column, head_column, str_columns,
+            sent_id=sent_id, sent_text=sent_text, root_idx=root_idx,
+            comments=comments
+        )
+
+    @staticmethod
+    def merge(
+            tree_l: "ColumnarCONLLUTree",
+            tree_r: "ColumnarCONLLUTree",
+            deprel: str,
+            is_arc_l2r: bool = True
+    ) -> "ColumnarCONLLUTree":
+        """
+        Columnar counterpart of `Inventory.merge_trees`.
+        """
+        l_root_idx = tree_l.root_idx
+        r_root_idx = tree_r.root_idx + len(tree_l)
+        if is_arc_l2r:
+            arc = (r_root_idx, l_root_idx, deprel)
+            root_idx = l_root_idx
+        else:
+            arc = (l_root_idx, r_root_idx, deprel)
+            root_idx = r_root_idx
+        return ColumnarCONLLUTree.concat(
+            [tree_l, tree_r], [arc], root_idx=root_idx
+        )
+
+    @property
+    def tokens(self) -> List[CONLLUTokenView]:
+        return [CONLLUTokenView(self, i) for i in range(len(self))]
+
+    def __str__(self):
+        return "\n".join(
+            self.comment_lines() + [str(token) for token in self.tokens]
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+    comment_lines = CONLLUTree.comment_lines
+
+    def html(self, fpath: Optional[str] = None) -> str:
+        return self.to_tree().html(fpath)
+
+    def latex(self, fpath: Optional[str] = None) -> str:
+        return self.to_tree().latex(fpath)
+
+    def __len__(self):
+        return len(self.idx_column)
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.tokens[item]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return CONLLUTokenView(self, item)
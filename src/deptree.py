@@ -1,8 +1,17 @@
-from copy import deepcopy
+import multiprocessing
+import sys
+import unicodedata
+from collections import ChainMap, OrderedDict, defaultdict
+from copy import copy
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Union
+from functools import partial
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+)
 
 from dep_tregex.ya_dep import visualize_tree
+from src.bloom import BloomFilter
+from src.parallel import map_ordered
 
 
 @dataclass(frozen=True)
@@ -14,6 +23,61 @@ class LexItem:
     lid: Optional[str] = None
     lang: Optional[str] = None
 
+    def __post_init__(self):
+        # words are dict keys, so the hash is computed once
+        object.__setattr__(self, "_hash", hash((
+            self.lemma, self.form, self.upos, self.xpos, self.lid, self.lang
+        )))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._hash == other._hash and (
+            self.lemma, self.form, self.upos, self.xpos, self.lid, self.lang
+        ) == (
+            other.lemma, other.form, other.upos,
+            other.xpos, other.lid, other.lang
+        )
+
+    def __reduce__(self):
+        # the hash differs between processes, so it is not pickled;
+        # unpickled words, e. g. from dataset caches, share their strings
+        return make_lex_item, (
+            self.lemma, self.form, self.upos, self.xpos, self.lid, self.lang
+        )
+
+
+def _intern_value(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def make_lex_item(
+        lemma: str,
+        form: Optional[str] = None,
+        upos: str = "_",
+        xpos: str = "_",
+        lid: Optional[str] = None,
+        lang: Optional[str] = None
+) -> LexItem:
+    """
+    `LexItem` factory for the readers: the strings of equal fields are
+    shared, e. g. a base lemma repeated over its derivatives is stored once.
+    """
+    return LexItem(
+        _intern_value(lemma), _intern_value(form), _intern_value(upos),
+        _intern_value(xpos), _intern_value(lid), _intern_value(lang)
+    )
+
+
+def normalize_lemma(lemma: str, casefold: bool = False) -> str:
+    lemma = unicodedata.normalize("NFC", lemma.strip())
+    return lemma.casefold() if casefold else lemma
+
 
 @dataclass(frozen=True)
 class WFToken:
@@ -91,12 +155,16 @@ class CONLLUToken:
 
 
 class CONLLUTree:
+    # also for the trees pickled before the comments were kept
+    comments: Sequence[str] = ()
+
     def __init__(
             self,
             tokens: List[CONLLUToken],
             sent_id: str = "",
             sent_text: Optional[str] = None,
-            root_idx: Optional[int] = None
+            root_idx: Optional[int] = None,
+            comments: Sequence[str] = ()
     ):
         self.tokens = tokens
 
@@ -109,13 +177,34 @@ class CONLLUTree:
 
         self.sent_id = sent_id
         self.sent_text = sent_text or ' '.join([token.form for token in tokens])
+        # all the comment lines of the source text, e. g. "# newdoc id = 1"
+        self.comments = list(comments)
+
+    def comment_lines(self) -> List[str]:
+        # the sent_id and text lines are written with the current values
+        # and the missing ones are added, the text right after the sent_id
+        lines = []
+        sent_id_pos = None
+        has_text = False
+        for line in self.comments:
+            key = line[1:].partition("=")[0].strip()
+            if key == "sent_id":
+                line = f'# sent_id = {self.sent_id}'
+                sent_id_pos = len(lines)
+            elif key == "text":
+                line = f'# text = {self.sent_text}'
+                has_text = True
+            lines.append(line)
+        if sent_id_pos is None:
+            lines.insert(0, f'# sent_id = {self.sent_id}')
+            sent_id_pos = 0
+        if not has_text:
+            lines.insert(sent_id_pos + 1, f'# text = {self.sent_text}')
+        return lines
 
     def __str__(self):
         return "\n".join(
-            [
-                f'# sent_id = {self.sent_id}',
-                f'# text = {self.sent_text}'
-            ] + [str(token) for token in self.tokens]
+            self.comment_lines() + [str(token) for token in self.tokens]
         )
 
     def __repr__(self):
@@ -162,12 +251,45 @@ class CONLLUTree:
     @classmethod
     def from_text(cls, text: str):
         lines = text.strip().split("\n")
-        tokens = [
-            CONLLUToken.from_str(line)
-            for line in lines
-            if (not line.startswith("#") and '-' not in line.split('\t')[0])
-        ]
-        return cls(tokens)
+        sent_id = ""
+        sent_text = None
+        comments = []
+        tokens = []
+        for line in lines:
+            if line.startswith("#"):
+                comments.append(line)
+                key, _, value = line[1:].partition("=")
+                key = key.strip()
+                if key == "sent_id":
+                    sent_id = value.strip()
+                elif key == "text":
+                    sent_text = value.strip()
+                continue
+            idx = line.split('\t')[0]
+            if '-' in idx or '.' in idx:
+                # multiword token or empty node
+                continue
+            tokens.append(CONLLUToken.from_str(line))
+        return cls(
+            tokens, sent_id=sent_id, sent_text=sent_text, comments=comments
+        )
+
+    @classmethod
+    def from_file(
+            cls, source: Union[str, Iterable[str]]
+    ) -> Iterator["CONLLUTree"]:
+        for text in iter_conllu_texts(source):
+            yield cls.from_text(text)
+
+    def copy(self) -> "CONLLUTree":
+        # token fields are immutable, so shallow token copies are enough
+        return CONLLUTree(
+            [copy(token) for token in self.tokens],
+            sent_id=self.sent_id,
+            sent_text=self.sent_text,
+            root_idx=self.root_idx,
+            comments=self.comments
+        )
 
     def __len__(self):
         return len(self.tokens)
@@ -179,6 +301,151 @@ class CONLLUTree:
         return self.tokens[item]
 
 
+def iter_conllu_texts(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """
+    Lazily splits a CoNLL-U document into sentences.
+    The source is either a path or an iterable of lines, e. g. an open file,
+    only one sentence is kept in memory at a time.
+    """
+    if isinstance(source, str):
+        with open(source, "r") as f:
+            yield from iter_conllu_texts(f)
+        return
+
+    lines = []
+    for line in source:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            lines.append(line)
+            continue
+        if lines:
+            yield "\n".join(lines)
+            lines = []
+    if lines:
+        yield "\n".join(lines)
+
+
+class CONLLUTreeBuilder:
+    """
+    Accumulates trees attached to the left and to the right
+    of a base tree and renumbers all tokens once in `build`.
+
+    A chain of n `Inventory.merge_trees` calls copies the growing tree
+    n times; the builder only keeps references to the attached trees,
+    so the whole chain costs a single copy of every token.
+
+    builder = CONLLUTreeBuilder(stem_tree)
+    builder.attach_left(prefix_tree, "deriv")  # merge_trees(prefix, stem)
+    builder.attach_right(suffix_tree, "deriv")  # merge_trees(stem, suffix)
+    word_tree = builder.build()
+    """
+    def __init__(self, tree: CONLLUTree):
+        # pieces: [tree, head piece of the tree root, deprel of the root]
+        self._pieces: List[list] = [[tree, None, None]]
+        self._left: List[int] = []  # pieces to the left, nearest first
+        self._right: List[int] = []  # pieces to the right, nearest first
+        self._root_piece = 0
+        self._len = len(tree)
+
+    def _add_piece(
+            self, tree: CONLLUTree, deprel: str, is_new_piece_head: bool
+    ) -> int:
+        piece = len(self._pieces)
+        self._pieces.append([tree, None, None])
+        if is_new_piece_head:
+            # the current root depends on the new tree
+            self._pieces[self._root_piece][1:] = [piece, deprel]
+            self._root_piece = piece
+        else:
+            # the new tree depends on the current root
+            self._pieces[piece][1:] = [self._root_piece, deprel]
+        self._len += len(tree)
+        return piece
+
+    def attach_left(
+            self, tree: CONLLUTree, deprel: str, is_arc_l2r: bool = False
+    ) -> "CONLLUTreeBuilder":
+        """
+        Same as `Inventory.merge_trees(tree, <current tree>, ...)`.
+        """
+        self._left.append(self._add_piece(tree, deprel, is_arc_l2r))
+        return self
+
+    def attach_right(
+            self, tree: CONLLUTree, deprel: str, is_arc_l2r: bool = True
+    ) -> "CONLLUTreeBuilder":
+        """
+        Same as `Inventory.merge_trees(<current tree>, tree, ...)`.
+        """
+        self._right.append(self._add_piece(tree, deprel, not is_arc_l2r))
+        return self
+
+    def build(self) -> CONLLUTree:
+        order = self._left[::-1] + [0] + self._right
+        offsets = [0] * len(self._pieces)
+        offset = 0
+        for piece in order:
+            offsets[piece] = offset
+            offset += len(self._pieces[piece][0])
+        # (token, head token, deprel) positions of the attachment arcs
+        arcs = []
+        for piece, (tree, head_piece, deprel) in enumerate(self._pieces):
+            if head_piece is None:
+                continue
+            head_tree = self._pieces[head_piece][0]
+            arcs.append((
+                offsets[piece] + tree.root_idx,
+                offsets[head_piece] + head_tree.root_idx,
+                deprel
+            ))
+        root_tree = self._pieces[self._root_piece][0]
+        root_idx = offsets[self._root_piece] + root_tree.root_idx
+
+        base_tree = self._pieces[0][0]
+        if not isinstance(base_tree, CONLLUTree):
+            # e. g. ColumnarCONLLUTree, renumbered column by column
+            return base_tree.concat(
+                [self._pieces[piece][0] for piece in order], arcs, root_idx
+            )
+
+        tokens = []
+        for piece in order:
+            tree = self._pieces[piece][0]
+            offset = offsets[piece]
+            for token in tree.tokens:
+                token = copy(token)
+                if offset:
+                    token.set_idx(token.iidx + offset)
+                    if token.ihead > 0:
+                        token.set_head(token.ihead + offset)
+                tokens.append(token)
+
+        for i, head_i, deprel in arcs:
+            tokens[i].set_head(tokens[head_i].iidx)
+            tokens[i].deprel = deprel
+
+        return CONLLUTree(tokens, root_idx=root_idx)
+
+    def __len__(self):
+        return self._len
+
+
+@dataclass(frozen=True)
+class RuleStep:
+    # a single affix attachment of a compiled rule
+    affix_tree: CONLLUTree
+    deprel: str
+    is_prefix: bool
+
+
+@dataclass(frozen=True)
+class RulePlan:
+    # a rule flattened into affix attachments, see `Inventory._compile_rule`
+    steps: Tuple[RuleStep, ...] = ()
+    modifier_steps: Tuple[Tuple[RuleStep, ...], ...] = ()
+    is_compound: bool = False
+
+
 class Inventory:
     def __init__(
             self,
@@ -186,12 +453,185 @@ class Inventory:
             word_analyses: Optional[Dict[LexItem, WFToken]] = None,
             word_trees: Optional[Dict[LexItem, CONLLUTree]] = None,
             bracketing_strategy: str = "last",
+            cache_size: Optional[int] = 100000,
+            lookup_order: Sequence[str] = ("exact", "lemma_upos"),
+            lookup_casefold: bool = False,
+            lemma_filter: Optional[BloomFilter] = None,
     ):
-        self.rules_by_ids: Dict[str, RuleInfo] = rules_by_ids or {}
-        self.word_analyses = word_analyses or {}
-        self.word_trees = word_trees or {}
+        # any mappings are accepted, e. g. views of on-disk stores,
+        # so empty ones must not be replaced
+        self.rules_by_ids: Dict[str, RuleInfo] = \
+            rules_by_ids if rules_by_ids is not None else {}
+        self.word_analyses = \
+            word_analyses if word_analyses is not None else {}
+        self.word_trees = word_trees if word_trees is not None else {}
         self.bracketing_strategy = bracketing_strategy
 
+        # LRU cache of derived subword trees;
+        # None means unbounded, 0 disables caching
+        self.cache_size = cache_size
+        self._tree_cache: "OrderedDict[tuple, CONLLUTree]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # rules compiled on first use
+        self._rule_plans: Dict[str, RulePlan] = {}
+        self._rule_steps: Dict[RuleInfo, RuleStep] = {}
+
+        # how `resolve` matches words of the texts, see LOOKUP_KINDS;
+        # "lemma" ignores the POS, so it is not used by default
+        for kind in lookup_order:
+            if kind not in self.LOOKUP_KINDS:
+                raise ValueError(f"Unknown lookup kind {kind}!")
+        self.lookup_order = tuple(lookup_order)
+        self.lookup_casefold = lookup_casefold
+        # normalized key -> stored word, built on first use
+        self._lookup_index: Optional[Dict[tuple, LexItem]] = None
+        # normalized lemmas of all the stored words (see `make_lemma_filter`);
+        # the words it rejects go to the single-token fallback at once;
+        # a given filter must be kept up to date by the caller
+        self.lemma_filter = lemma_filter
+        # the filter made by `build_lemma_filter` and its error rate
+        self._own_filter: Optional[BloomFilter] = None
+        self._own_filter_error_rate = 0.01
+
+    def cache_info(self) -> Dict[str, Optional[int]]:
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._tree_cache),
+            "max_size": self.cache_size,
+        }
+
+    def compact(self):
+        """
+        Replaces layered views (see `unite_inventories`) with plain dicts.
+        """
+        for name in ["rules_by_ids", "word_analyses", "word_trees"]:
+            mapping = getattr(self, name)
+            if isinstance(mapping, ChainMap):
+                setattr(self, name, dict(mapping))
+
+    def clear_cache(self):
+        # must be called after changing analyses or rules in place
+        self._tree_cache.clear()
+        self._rule_plans.clear()
+        self._rule_steps.clear()
+        self._lookup_index = None
+        if self.lemma_filter is not None \
+                and self.lemma_filter is self._own_filter:
+            # a stale filter could reject new words
+            self.build_lemma_filter(self._own_filter_error_rate)
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    # the keys `resolve` can match by, from the most specific one:
+    # the word itself, normalized (lang, lemma, upos), (lang, lemma)
+    LOOKUP_KINDS = ("exact", "lemma_upos", "lemma")
+
+    def _lookup_key(self, kind: str, word: LexItem, lang: Optional[str]):
+        lemma = normalize_lemma(word.lemma, self.lookup_casefold)
+        if kind == "lemma":
+            return kind, lang, lemma
+        return kind, lang, lemma, word.upos
+
+    @staticmethod
+    def _iter_layers(mapping) -> Iterator:
+        # the layers of `unite_inventories` views, the first one wins
+        if isinstance(mapping, ChainMap):
+            for layer in mapping.maps:
+                yield from Inventory._iter_layers(layer)
+        else:
+            yield mapping
+
+    def _build_lookup_index(self) -> Dict[tuple, LexItem]:
+        kinds = [kind for kind in self.lookup_order if kind != "exact"]
+        index = {}
+        # for equal keys the words of the upper layers win,
+        # and the words with trees win over the analysed ones;
+        # on-disk stores are searched by `_find_stored` instead
+        for mapping in [self.word_analyses, self.word_trees]:
+            for layer in reversed(list(self._iter_layers(mapping))):
+                if not isinstance(layer, dict):
+                    continue
+                for word in layer:
+                    for kind in kinds:
+                        # words without a language match any stored one
+                        for lang in {word.lang, None}:
+                            index[self._lookup_key(kind, word, lang)] = word
+        return index
+
+    def resolve(self, word: LexItem) -> Optional[LexItem]:
+        """
+        The stored word which best matches the given one,
+        e. g. LexItem("Häuser", "Häuser", "NOUN") of a UD text
+        for LexItem("Häuser", "Häuser", "NOUN", lang="deu") of a reader,
+        trying the kinds of keys in `lookup_order`; None if there is none.
+        """
+        for kind in self.lookup_order:
+            if kind == "exact":
+                if word in self.word_trees or word in self.word_analyses:
+                    return word
+                continue
+            if self._lookup_index is None:
+                self._lookup_index = self._build_lookup_index()
+            found = self._lookup_index.get(
+                self._lookup_key(kind, word, word.lang)
+            ) or self._find_stored(kind, word)
+            if found is not None:
+                return found
+        return None
+
+    def _find_stored(self, kind: str, word: LexItem) -> Optional[LexItem]:
+        # indexed queries of on-disk stores and store layers of views,
+        # e. g. `SQLiteMapping.find` and `TreeStore.find`
+        for mapping in [self.word_trees, self.word_analyses]:
+            for layer in self._iter_layers(mapping):
+                if isinstance(layer, dict) or not hasattr(layer, "find"):
+                    continue
+                for found in layer.find(
+                        word.lemma,
+                        upos=word.upos if kind == "lemma_upos" else None,
+                        lang=word.lang,
+                        casefold=self.lookup_casefold
+                ):
+                    return found
+        return None
+
+    @staticmethod
+    def make_lemma_filter(
+            lemmas: Iterable[str], error_rate: float = 0.01
+    ) -> BloomFilter:
+        # case folded, so that it suits any `lookup_casefold`
+        return BloomFilter.from_values(
+            (normalize_lemma(lemma, casefold=True) for lemma in lemmas),
+            error_rate
+        )
+
+    def build_lemma_filter(self, error_rate: float = 0.01) -> BloomFilter:
+        """
+        Makes the filter of the stored lemmas; it is rebuilt
+        by `clear_cache`, unlike a filter given to the constructor.
+        """
+        self.lemma_filter = self._own_filter = self.make_lemma_filter(
+            (
+                word.lemma
+                for mapping in [self.word_analyses, self.word_trees]
+                for word in mapping
+            ),
+            error_rate
+        )
+        self._own_filter_error_rate = error_rate
+        return self.lemma_filter
+
+    def _is_filtered_out(self, word: LexItem) -> bool:
+        # True if the word is surely not stored, even as `resolve` matches
+        return (
+            self.lemma_filter is not None
+            and normalize_lemma(word.lemma, casefold=True)
+            not in self.lemma_filter
+        )
+
     @staticmethod
     def merge_trees(
             tree_l: CONLLUTree,
@@ -199,31 +639,52 @@ class Inventory:
             deprel: str,
             is_arc_l2r: bool = True
     ) -> CONLLUTree:
-        tokens_l = deepcopy(tree_l.tokens)
-        tokens_r = deepcopy(tree_r.tokens)
-        l = len(tree_l.tokens)
-        for t in tokens_r:
-            t.set_idx(t.iidx + l)
-            if t.ihead > 0:
-                t.set_head(t.ihead + l)
-
-        l_root_idx = tree_l.root_idx
-        r_root_idx = tree_r.root_idx
-        if is_arc_l2r:
-            tokens_r[r_root_idx].set_head(tokens_l[l_root_idx].iidx)
-            tokens_r[r_root_idx].deprel = deprel
-            root_idx = l_root_idx
-        else:
-            tokens_l[l_root_idx].set_head(tokens_r[r_root_idx].iidx)
-            tokens_l[l_root_idx].deprel = deprel
-            root_idx = r_root_idx + l
-        return CONLLUTree(tokens_l + tokens_r, root_idx=root_idx)
+        if not isinstance(tree_l, CONLLUTree):
+            # e. g. ColumnarCONLLUTree
+            return tree_l.merge(tree_l, tree_r, deprel, is_arc_l2r)
+        if not isinstance(tree_r, CONLLUTree):
+            return tree_r.merge(tree_l, tree_r, deprel, is_arc_l2r)
+        builder = CONLLUTreeBuilder(tree_l)
+        builder.attach_right(tree_r, deprel, is_arc_l2r=is_arc_l2r)
+        return builder.build()
 
-    def _merge_with_simple_rule(
-            self,
-            stem_tree: CONLLUTree,
-            rule: RuleInfo
-    ) -> CONLLUTree:
+    # rule info -> (deprel, is the affix attached to the left)
+    RULE_KINDS: Dict[str, Tuple[str, bool]] = {
+        # derivational suffix
+        "SFX": ("deriv", False),
+        # postfix, e. g. Russian -ся/-сь
+        "PTFX": ("expl:pv", False),
+        # derivational prefix
+        "PFX": ("deriv", True),
+        # conversion
+        "CONV": ("conv", False),
+        # inflectional interfix: Russ[-ia] + (o) + phobia
+        # TODO: handle inflection
+        "INTERFIX": ("infl", False),
+        # TODO: handle inflection
+        "INFL": ("infl", False),
+    }
+
+    @classmethod
+    def register_rule_kind(
+            cls, info: str, deprel: str, is_prefix: bool = False
+    ):
+        """
+        Registers a new simple rule kind, e. g.
+        Inventory.register_rule_kind("CIRCUMFIX_L", "deriv", is_prefix=True)
+        """
+        # copy, so that subclasses do not change the parent registry
+        cls.RULE_KINDS = {**cls.RULE_KINDS, info: (deprel, is_prefix)}
+
+    def _compile_step(self, rule: RuleInfo) -> RuleStep:
+        step = self._rule_steps.get(rule)
+        if step is not None:
+            return step
+        if rule.info not in self.RULE_KINDS:
+            raise AssertionError(
+                'Rule info is incorrect!', rule.short_id, rule.info
+            )
+        deprel, is_prefix = self.RULE_KINDS[rule.info]
         affix_tree = CONLLUTree(
             [
                 CONLLUToken(
@@ -234,63 +695,93 @@ class Inventory:
                 )
             ]
         )
-        if rule.info == "SFX":
-            # derivational suffix
-            tree = self.merge_trees(
-                stem_tree, affix_tree, deprel="deriv", is_arc_l2r=True
-            )
-        elif rule.info == "PTFX":
-            # postfix, e. g. Russian -ся/-сь
-            tree = self.merge_trees(
-                stem_tree, affix_tree, deprel="expl:pv", is_arc_l2r=True
-            )
-        elif rule.info == "PFX":
-            # derivational prefix
-            tree = self.merge_trees(
-                affix_tree, stem_tree, deprel="deriv", is_arc_l2r=False
-            )
-        elif rule.info == "CONV":
-            # conversion
-            tree = self.merge_trees(
-                stem_tree, affix_tree, deprel="conv", is_arc_l2r=True
-            )
-        elif rule.info == "INTERFIX":
-            # inflectional interfix: Russ[-ia] + (o) + phobia
-            # TODO: handle inflection
-            tree = self.merge_trees(
-                stem_tree, affix_tree, deprel="infl", is_arc_l2r=True
-            )
-        elif rule.info == "INFL":
-            # TODO: handle inflection
-            tree = self.merge_trees(
-                stem_tree, affix_tree, deprel="infl", is_arc_l2r=True
-            )
-        else:
-            raise AssertionError(
-                'Rule info is incorrect!', rule.short_id, rule.info
+        step = RuleStep(affix_tree, deprel, is_prefix)
+        self._rule_steps[rule] = step
+        return step
+
+    def _compile_steps(self, rules: List[RuleInfo]) -> Tuple[RuleStep, ...]:
+        steps = []
+        for rule in rules:
+            if isinstance(rule, ComplexRuleInfo):
+                steps.extend(self._compile_steps(rule.simple_rules))
+            else:
+                steps.append(self._compile_step(rule))
+        return tuple(steps)
+
+    def _compile_rule(self, rule: RuleInfo) -> RulePlan:
+        if isinstance(rule, CompoundRuleInfo):
+            # modifier rules (e. g. interfixation) are applied to modifiers,
+            # head rules and after rules (e. g. prefix) to the whole compound
+            return RulePlan(
+                steps=self._compile_steps(
+                    (rule.head_rules or []) + (rule.after_rules or [])
+                ),
+                modifier_steps=tuple(
+                    self._compile_steps(m_rules)
+                    for m_rules in rule.modifier_rules or []
+                ),
+                is_compound=True
             )
-        return tree
+        if isinstance(rule, ComplexRuleInfo):
+            return RulePlan(steps=self._compile_steps(rule.simple_rules))
+        if isinstance(rule, RuleInfo):
+            return RulePlan(steps=(self._compile_step(rule),))
+        raise NotImplementedError
+
+    def _get_rule_plan(self, rule_id: Optional[str]) -> Optional[RulePlan]:
+        plan = self._rule_plans.get(rule_id)
+        if plan is None:
+            rule = self.rules_by_ids.get(rule_id, None)
+            if rule is None:
+                return None
+            plan = self._compile_rule(rule)
+            self._rule_plans[rule_id] = plan
+        return plan
+
+    @staticmethod
+    def _apply_steps(
+            stem_tree: CONLLUTree,
+            steps: Tuple[RuleStep, ...]
+    ) -> CONLLUTree:
+        if not steps:
+            return stem_tree
+        builder = CONLLUTreeBuilder(stem_tree)
+        for step in steps:
+            if step.is_prefix:
+                builder.attach_left(
+                    step.affix_tree, step.deprel, is_arc_l2r=False
+                )
+            else:
+                builder.attach_right(
+                    step.affix_tree, step.deprel, is_arc_l2r=True
+                )
+        return builder.build()
+
+    def _merge_with_simple_rule(
+            self,
+            stem_tree: CONLLUTree,
+            rule: RuleInfo
+    ) -> CONLLUTree:
+        return self._apply_steps(stem_tree, (self._compile_step(rule),))
 
     def _make_modifiers_tree(
             self,
             stem_tree: CONLLUTree,
-            modifiers: List[LexItem],
-            modifier_rules: Optional[List[List[str]]] = None,
+            modifiers: List[CONLLUTree],
+            modifier_steps: Optional[Tuple[Tuple[RuleStep, ...], ...]] = None,
     ):
         if not modifiers:
             return stem_tree
 
-        if not modifier_rules:
-            modifier_rules = [[]] * len(modifiers)
+        if not modifier_steps:
+            modifier_steps = ((),) * len(modifiers)
 
-        assert len(modifiers) == len(modifier_rules)
+        assert len(modifiers) == len(modifier_steps)
 
-        modifiers_trees = []
-        for m, m_rules in zip(modifiers, modifier_rules):
-            m_tree = self.make_subword_tree(m)
-            for m_rule in m_rules:
-                m_tree = self._merge_with_simple_rule(m_tree, m_rule)
-            modifiers_trees.append(m_tree)
+        modifiers_trees = [
+            self._apply_steps(m_tree, m_steps)
+            for m_tree, m_steps in zip(modifiers, modifier_steps)
+        ]
 
         # handle dependency relations between modifiers
         if self.bracketing_strategy == "head":
@@ -329,34 +820,250 @@ class Inventory:
 
         return stem_tree
 
+    def _get_derivation_levels(
+            self, ignore_errors: bool = False
+    ) -> Tuple[List[List[LexItem]], List[LexItem]]:
+        """
+        Sorts the analysed words without a stored tree topologically:
+        every word comes in a later level than its base and modifiers.
+        Also returns the words of cyclic derivations and their descendants;
+        unless `ignore_errors`, such words raise a ValueError.
+        """
+        pending = {
+            word for word in self.word_analyses if word not in self.word_trees
+        }
+        n_parents: Dict[LexItem, int] = {}
+        children: Dict[LexItem, List[LexItem]] = defaultdict(list)
+        for word in pending:
+            wf_token = self.word_analyses[word]
+            parents = {wf_token.d_from, *(wf_token.d_modifiers or [])}
+            parents &= pending
+            n_parents[word] = len(parents)
+            for parent in parents:
+                children[parent].append(word)
+
+        levels = []
+        level = [word for word, n in n_parents.items() if n == 0]
+        n_sorted = 0
+        while level:
+            levels.append(level)
+            n_sorted += len(level)
+            next_level = []
+            for word in level:
+                for child in children[word]:
+                    n_parents[child] -= 1
+                    if n_parents[child] == 0:
+                        next_level.append(child)
+            level = next_level
+
+        cyclic = []
+        if n_sorted < len(pending):
+            cyclic = [word for word, n in n_parents.items() if n > 0]
+            error = ValueError(
+                f"Cyclic derivations of {len(cyclic)} words, "
+                f"e. g. {cyclic[0]}!"
+            )
+            if not ignore_errors:
+                raise error
+            print(error)
+        return levels, cyclic
+
+    def materialize_all(
+            self,
+            n_workers: int = 1,
+            chunk_size: int = 1024,
+            ignore_errors: bool = False
+    ) -> int:
+        """
+        Builds the subword trees of all analysed words and stores them
+        in `word_trees`, so that every tree is built exactly once
+        from the already built trees of its base and modifiers.
+        The trees are built for the current bracketing strategy.
+        With `n_workers` > 1 each topological level is built in a process pool.
+        Returns the number of built trees. With `ignore_errors`,
+        the words which cannot be built, e. g. cyclic derivations,
+        are skipped and their number is printed.
+        """
+        levels, cyclic = self._get_derivation_levels(ignore_errors)
+        n_built = 0
+        n_failed = len(cyclic)
+        pool = None
+        if n_workers > 1:
+            pool = multiprocessing.Pool(
+                n_workers, initializer=_init_worker, initargs=(self,)
+            )
+        try:
+            for level in levels:
+                if pool is None or len(level) <= chunk_size:
+                    built = _build_trees(self, level, ignore_errors)
+                else:
+                    tasks = []
+                    for chunk in _iter_chunks(level, chunk_size):
+                        parent_trees = {}
+                        for word in chunk:
+                            wf_token = self.word_analyses[word]
+                            for parent in [
+                                wf_token.d_from, *(wf_token.d_modifiers or [])
+                            ]:
+                                if parent in self.word_trees:
+                                    parent_trees[parent] = \
+                                        self.word_trees[parent]
+                        tasks.append((chunk, parent_trees, ignore_errors))
+                    built = []
+                    for chunk_built in pool.imap(_build_trees_chunk, tasks):
+                        built.extend(chunk_built)
+                for word, tree in built:
+                    self.word_trees[word] = tree
+                n_built += len(built)
+                n_failed += len(level) - len(built)
+        finally:
+            if pool is not None:
+                pool.terminate()
+        if n_failed:
+            print(f"Failed to build {n_failed} trees")
+
+        # the stored trees take precedence over the cached ones
+        self._tree_cache.clear()
+        return n_built
+
     def make_subword_tree(self, word: LexItem) -> CONLLUTree:
+        """
+        Returns a subword tree for the word.
+        The tree is a private copy, so the caller is free to modify it.
+        """
+        if self._is_filtered_out(word):
+            return self._make_single_token_tree(word)
+        return self._get_subword_tree(word).copy()
+
+    def _get_subword_tree(self, word: LexItem) -> CONLLUTree:
+        # the returned tree may be shared with the cache or `word_trees`,
+        # so it must not be modified in place
+        tree = self._lookup_subword_tree(word)
+        if tree is None:
+            tree = self._resolve_subword_tree(word)
+        return tree
+
+    def _lookup_subword_tree(self, word: LexItem) -> Optional[CONLLUTree]:
+        # returns None if the tree has to be built
         if word in self.word_trees:
             return self.word_trees[word]
         if word not in self.word_analyses:
-            return CONLLUTree(
-                [
-                    CONLLUToken(
-                        idx="1",
-                        form=word.form,
-                        lemma=word.lemma,
-                        upos=word.upos,
-                        xpos=word.xpos
+            return self._make_single_token_tree(word)
+        if self.cache_size == 0:
+            return None
+
+        key = (word, self.bracketing_strategy)
+        tree = self._tree_cache.get(key)
+        if tree is not None:
+            self._cache_hits += 1
+            self._tree_cache.move_to_end(key)
+        return tree
+
+    def _cache_tree(self, word: LexItem, tree: CONLLUTree):
+        if self.cache_size == 0:
+            return
+        self._cache_misses += 1
+        self._tree_cache[(word, self.bracketing_strategy)] = tree
+        if (
+                self.cache_size is not None
+                and len(self._tree_cache) > self.cache_size
+        ):
+            self._tree_cache.popitem(last=False)
+
+    def _resolve_subword_tree(self, word: LexItem) -> CONLLUTree:
+        """
+        Builds the tree of the word and all its unresolved bases and modifiers
+        in post-order with an explicit stack instead of recursion,
+        so that long derivation chains do not hit the recursion limit
+        and cyclic analyses raise a ValueError instead of looping forever.
+        """
+        resolved: Dict[LexItem, CONLLUTree] = {}
+        # words whose parents are being resolved, the derived word first
+        path: List[LexItem] = []
+        on_path = set()
+        stack = [word]
+        while stack:
+            w = stack[-1]
+            if w in resolved:
+                stack.pop()
+                continue
+            if w in on_path:
+                # all parents are resolved
+                stack.pop()
+                path.pop()
+                on_path.discard(w)
+                tree = self._build_subword_tree(w, resolved)
+                self._cache_tree(w, tree)
+                resolved[w] = tree
+                continue
+
+            path.append(w)
+            on_path.add(w)
+            for parent in self._get_parents(w):
+                if parent in resolved:
+                    continue
+                if parent in on_path:
+                    cycle = path[path.index(parent):] + [parent]
+                    raise ValueError(
+                        "Cyclic derivation: "
+                        + " <- ".join(str(x) for x in cycle)
                     )
-                ]
-            )
+                tree = self._lookup_subword_tree(parent)
+                if tree is not None:
+                    resolved[parent] = tree
+                else:
+                    stack.append(parent)
+        return resolved[word]
+
+    @staticmethod
+    def _make_single_token_tree(word: LexItem) -> CONLLUTree:
+        return CONLLUTree(
+            [
+                CONLLUToken(
+                    idx="1",
+                    form=word.form,
+                    lemma=word.lemma,
+                    upos=word.upos,
+                    xpos=word.xpos
+                )
+            ]
+        )
+
+    def _get_parents(self, word: LexItem) -> List[LexItem]:
+        # the base and the modifiers the tree of the word is built from
+        wf_token = self.word_analyses[word]
+        plan = self._get_rule_plan(wf_token.rule_id)
+        if plan is None or plan.is_compound:
+            return [wf_token.d_from, *(wf_token.d_modifiers or [])]
+        return [wf_token.d_from]
+
+    def _build_subword_tree(
+            self,
+            word: LexItem,
+            parent_trees: Optional[Dict[LexItem, CONLLUTree]] = None
+    ) -> CONLLUTree:
+        # builds the tree from the trees of the base and the modifiers,
+        # which are taken from `parent_trees` when possible
+        def get_parent_tree(parent: LexItem) -> CONLLUTree:
+            if parent_trees is not None and parent in parent_trees:
+                return parent_trees[parent]
+            return self._get_subword_tree(parent)
+
         wf_token = self.word_analyses[word]
-        stem_tree = self.make_subword_tree(wf_token.d_from)
+        stem_tree = get_parent_tree(wf_token.d_from)
 
-        rule = self.rules_by_ids.get(wf_token.rule_id, None)
+        plan = self._get_rule_plan(wf_token.rule_id)
 
-        if rule is None:
+        if plan is None:
             # unknown rule; default handling for pure compounds and affixes
             if wf_token.d_modifiers is not None:
                 # compound without a rule, pure compounds only!
                 # 3-Zimmer-Wohnung
                 stem_tree = self._make_modifiers_tree(
                     stem_tree=stem_tree,
-                    modifiers=wf_token.d_modifiers
+                    modifiers=[
+                        get_parent_tree(m) for m in wf_token.d_modifiers
+                    ]
                 )
                 return stem_tree
             else:
@@ -364,59 +1071,281 @@ class Inventory:
                     f"No rule is provided for {word} <- {wf_token}!"
                 )
 
-        if isinstance(rule, CompoundRuleInfo):
-            # applying modifier rules, e. g. interfixation
+        if plan.is_compound:
             stem_tree = self._make_modifiers_tree(
                 stem_tree=stem_tree,
-                modifiers=wf_token.d_modifiers or [],
-                modifier_rules=rule.modifier_rules or []
+                modifiers=[
+                    get_parent_tree(m) for m in wf_token.d_modifiers or []
+                ],
+                modifier_steps=plan.modifier_steps
             )
-            for r in rule.head_rules or []:
-                stem_tree = self._merge_with_simple_rule(stem_tree, r)
-            for r in rule.after_rules or []:  # e. g. prefix
-                stem_tree = self._merge_with_simple_rule(stem_tree, r)
-            return stem_tree
-
-        if isinstance(rule, ComplexRuleInfo):
-            for simple_rule in rule.simple_rules:
-                stem_tree = self._merge_with_simple_rule(stem_tree, simple_rule)
-            return stem_tree
-
-        if isinstance(rule, RuleInfo):
-            stem_tree = self._merge_with_simple_rule(stem_tree, rule)
-            return stem_tree
-        raise NotImplementedError
+        return self._apply_steps(stem_tree, plan.steps)
 
     @staticmethod
     def load_tree(text: str) -> CONLLUTree:
         word_tree = CONLLUTree.from_text(text)
         return word_tree
 
-    def make_tree(self, text: str) -> CONLLUTree:
+    def iter_trees(
+            self,
+            source: Union[str, Iterable[str]],
+            n_workers: int = 1,
+            chunk_size: int = 256,
+            lang: Optional[str] = None
+    ) -> Iterator[CONLLUTree]:
+        """
+        Converts a CoNLL-U document sentence by sentence.
+        The source is a path or an iterable of lines, e. g. an open file.
+        The sentences are converted by `make_trees` in chunks
+        of `chunk_size`; with `n_workers` > 1 the chunks are converted
+        in a process pool, the trees are still yielded in the input order.
+        """
+        texts = iter_conllu_texts(source)
+        if n_workers <= 1:
+            for chunk in _iter_chunks(texts, chunk_size):
+                yield from self.make_trees(chunk, lang)[0]
+            return
+        for trees in map_ordered(
+            partial(_make_trees_chunk, lang=lang),
+            ((chunk,) for chunk in _iter_chunks(texts, chunk_size)),
+            n_workers, initializer=_init_worker, initargs=(self,)
+        ):
+            yield from trees
+
+    def write_trees(
+            self,
+            source: Union[str, Iterable[str]],
+            output: Union[str, TextIO],
+            n_workers: int = 1,
+            chunk_size: int = 256,
+            raw: bool = False,
+            lang: Optional[str] = None
+    ) -> int:
+        """
+        Converts a CoNLL-U document and streams the subword trees to a path
+        or an open file. Returns the number of written sentences.
+        See `iter_trees` for the parallel mode.
+        With `raw`, the sentences are converted by `rewrite_text`,
+        which is much faster when few words are in the inventory.
+        """
+        if isinstance(output, str):
+            with open(output, "w") as f:
+                return self.write_trees(
+                    source, f, n_workers, chunk_size, raw=raw, lang=lang
+                )
+
+        n_trees = 0
+        if n_workers <= 1:
+            if raw:
+                trees = (
+                    self.rewrite_text(text, lang)
+                    for text in iter_conllu_texts(source)
+                )
+            else:
+                trees = self.iter_trees(
+                    source, chunk_size=chunk_size, lang=lang
+                )
+            for tree in trees:
+                output.write(f"{tree}\n\n")
+                n_trees += 1
+            return n_trees
+
+        # workers send back serialized trees, which are cheaper to pickle
+        chunks = _iter_chunks(iter_conllu_texts(source), chunk_size)
+        for lines in map_ordered(
+            partial(_rewrite_chunk if raw else _make_lines_chunk, lang=lang),
+            ((chunk,) for chunk in chunks),
+            n_workers, initializer=_init_worker, initargs=(self,)
+        ):
+            for line in lines:
+                output.write(f"{line}\n\n")
+            n_trees += len(lines)
+        return n_trees
+
+    def _find_text_word_tree(self, word: LexItem) -> Optional[CONLLUTree]:
+        # the shared subword tree of a stored word, None for unknown words
+        if self._is_filtered_out(word):
+            return None
+        word = self.resolve(word)
+        if word is None:
+            return None
+        return self._get_subword_tree(word)
+
+    def rewrite_text(self, text: str, lang: Optional[str] = None) -> str:
+        """
+        `make_tree` on raw CoNLL-U lines: only the words found
+        in the inventory are replaced with their subword trees, the other
+        lines are copied with the new ID, HEAD and DEPS ids,
+        and comments, multiword tokens and empty nodes are kept.
+        The root of a subword tree takes the HEAD, DEPREL and DEPS
+        of its word. A sentence without such words is returned as it is.
+        """
+        lines = text.split("\n")
+        rows = []
+        # old word id -> new ids of its first token, root and last token
+        first_ids = {}
+        root_ids = {"0": 0}
+        last_ids = {"0": 0}
+        n_tokens = 0
+        is_changed = False
+        for line in lines:
+            if not line or line.startswith("#"):
+                rows.append((line, None, None))
+                continue
+            fields = line.split("\t")
+            idx = fields[0]
+            if not idx.isdigit():
+                # multiword token or empty node
+                rows.append((line, fields, None))
+                continue
+            tree = self._find_text_word_tree(LexItem(
+                lemma=fields[2], form=fields[1], upos=fields[3], lang=lang
+            ))
+            first_ids[idx] = n_tokens + 1
+            if tree is None:
+                n_tokens += 1
+                root_ids[idx] = n_tokens
+            else:
+                root_ids[idx] = n_tokens + tree.root_idx + 1
+                n_tokens += len(tree)
+                is_changed = True
+            last_ids[idx] = n_tokens
+            rows.append((line, fields, tree))
+        if not is_changed:
+            return text
+
+        def rewrite_deps(deps: str) -> str:
+            # e. g. 3:conj|5.1:nsubj
+            if deps == "_":
+                return deps
+            arcs = []
+            for arc in deps.split("|"):
+                head, sep, deprel = arc.partition(":")
+                word_idx, dot, empty_idx = head.partition(".")
+                if dot:
+                    head = f"{last_ids[word_idx]}.{empty_idx}"
+                else:
+                    head = str(root_ids[head])
+                arcs.append(f"{head}{sep}{deprel}")
+            return "|".join(arcs)
+
+        output = []
+        for line, fields, tree in rows:
+            if fields is None:
+                output.append(line)
+                continue
+            idx = fields[0]
+            if "-" in idx:
+                start, _, end = idx.partition("-")
+                fields[0] = f"{first_ids[start]}-{last_ids[end]}"
+            elif "." in idx:
+                word_idx, _, empty_idx = idx.partition(".")
+                fields[0] = f"{last_ids[word_idx]}.{empty_idx}"
+                fields[8] = rewrite_deps(fields[8])
+            elif tree is None:
+                fields[0] = str(root_ids[idx])
+                fields[6] = str(root_ids.get(fields[6], fields[6]))
+                fields[8] = rewrite_deps(fields[8])
+            else:
+                offset = first_ids[idx] - 1
+                for i, token in enumerate(tree.tokens):
+                    # the root takes the arcs of the word
+                    if i == tree.root_idx:
+                        head = str(root_ids.get(fields[6], fields[6]))
+                        deprel = fields[7]
+                        deps = rewrite_deps(fields[8])
+                    else:
+                        head = str(token.ihead + offset)
+                        deprel = token.deprel
+                        deps = "_"
+                    output.append("\t".join([
+                        str(offset + i + 1), token.form, token.lemma,
+                        token.upos, token.xpos, token.feats,
+                        head, deprel, deps, token.misc
+                    ]))
+                continue
+            output.append("\t".join(fields))
+        return "\n".join(output)
+
+    @staticmethod
+    def _get_token_lex(token: CONLLUToken, lang: Optional[str]) -> LexItem:
+        return LexItem(
+            lemma=token.lemma,
+            form=token.form,
+            upos=token.upos,
+            lang=lang,
+        )
+
+    def make_tree(self, text: str, lang: Optional[str] = None) -> CONLLUTree:
         word_tree = self.load_tree(text)
         subword_trees = []
-        subword_roots = [-1]
-        cur_len = 0
-        united_subword_tokens = []
         for token in word_tree.tokens:
-            token_lex = LexItem(
-                lemma=token.lemma,
-                form=token.form,
-                upos=token.upos,
+            token_lex = self._get_token_lex(token, lang)
+            subword_tree = self._find_text_word_tree(token_lex)
+            # unknown words become single-token trees
+            subword_trees.append(
+                self._make_single_token_tree(token_lex)
+                if subword_tree is None else subword_tree.copy()
             )
-            subword_tree = self.make_subword_tree(token_lex)
+        return self._unite_subword_trees(word_tree, subword_trees)
+
+    def make_trees(
+            self, texts: Iterable[str], lang: Optional[str] = None
+    ) -> Tuple[List[CONLLUTree], Dict[str, int]]:
+        """
+        `make_tree` for a batch of sentences: the subword tree
+        of each distinct word of the batch is looked up only once.
+        Also returns the numbers of tokens, distinct words,
+        distinct words found in the inventory, and expanded tokens.
+        """
+        word_trees = [self.load_tree(text) for text in texts]
+        # distinct words -> shared subword trees, None for unknown words
+        found_trees: Dict[LexItem, Optional[CONLLUTree]] = {}
+        n_tokens = 0
+        n_expansions = 0
+        trees = []
+        for word_tree in word_trees:
+            subword_trees = []
+            for token in word_tree.tokens:
+                token_lex = self._get_token_lex(token, lang)
+                if token_lex in found_trees:
+                    subword_tree = found_trees[token_lex]
+                else:
+                    subword_tree = found_trees[token_lex] = \
+                        self._find_text_word_tree(token_lex)
+                n_tokens += 1
+                if subword_tree is None:
+                    subword_tree = self._make_single_token_tree(token_lex)
+                else:
+                    subword_tree = subword_tree.copy()
+                    n_expansions += 1
+                subword_trees.append(subword_tree)
+            trees.append(self._unite_subword_trees(word_tree, subword_trees))
+
+        stats = {
+            "tokens": n_tokens,
+            "distinct": len(found_trees),
+            "hits": sum(tree is not None for tree in found_trees.values()),
+            "expansions": n_expansions,
+        }
+        return trees, stats
+
+    @staticmethod
+    def _unite_subword_trees(
+            word_tree: CONLLUTree, subword_trees: List[CONLLUTree]
+    ) -> CONLLUTree:
+        subword_roots = [-1]
+        cur_len = 0
+        for subword_tree in subword_trees:
             subword_roots.append(cur_len + subword_tree.root_idx)
-            subword_trees.append(subword_tree)
-            for subword_token in subword_tree.tokens:
-                subword_token.set_idx(len(united_subword_tokens) + 1)
-                subword_token.set_head(int(subword_token.head) + cur_len)
-                united_subword_tokens.append(subword_token)
             cur_len += len(subword_tree)
 
         renumerated = {"0": 0}
         for i, token in enumerate(word_tree.tokens):
             renumerated[token.idx] = i + 1
 
+        # (subword root, its head or -1 for the root, deprel)
+        arcs = []
         for i, token in enumerate(word_tree.tokens):
             if token.head.isdigit():
                 head_idx = token.head
@@ -424,32 +1353,141 @@ class Inventory:
                 # 33.1	_	_	_	_	_	_	_	3:conj	_
                 head_idx = token.deps.split(":")[0]
             renum_head = renumerated[head_idx]
-            idx = subword_roots[i + 1]
-            united_subword_tokens[idx].set_head(subword_roots[renum_head] + 1)
-            united_subword_tokens[idx].deprel = token.deprel
+            arcs.append(
+                (subword_roots[i + 1], subword_roots[renum_head], token.deprel)
+            )
+
+        for subword_tree in subword_trees:
+            if not isinstance(subword_tree, CONLLUTree):
+                # e. g. ColumnarCONLLUTree, renumbered column by column
+                return subword_tree.concat(
+                    subword_trees, arcs,
+                    sent_id=word_tree.sent_id, sent_text=word_tree.sent_text,
+                    comments=word_tree.comments
+                )
+
+        # the subword trees are renumbered in place
+        cur_len = 0
+        united_subword_tokens = []
+        for subword_tree in subword_trees:
+            for subword_token in subword_tree.tokens:
+                subword_token.set_idx(len(united_subword_tokens) + 1)
+                subword_token.set_head(int(subword_token.head) + cur_len)
+                united_subword_tokens.append(subword_token)
+            cur_len += len(subword_tree)
+
+        for idx, head_idx, deprel in arcs:
+            united_subword_tokens[idx].set_head(head_idx + 1)
+            united_subword_tokens[idx].deprel = deprel
 
         return CONLLUTree(
             united_subword_tokens,
             sent_id=word_tree.sent_id,
             sent_text=word_tree.sent_text,
+            comments=word_tree.comments
         )
 
 
-def unite_inventories(*inventories: Inventory) -> Inventory:
-    rules_by_ids = {}
-    word_analyses = {}
-    word_trees = {}
-    for inventory in inventories:
-        rules_by_ids.update(inventory.rules_by_ids)
-        word_analyses.update(inventory.word_analyses)
-        word_trees.update(inventory.word_trees)
+# The inventory of a worker process, set once by the pool initializer:
+# inherited on fork or unpickled once per worker on spawn.
+_worker_inventory: Optional[Inventory] = None
+
+
+def _init_worker(inventory: Inventory):
+    global _worker_inventory
+    _worker_inventory = inventory
+
+
+def _make_trees_chunk(
+        texts: List[str], lang: Optional[str] = None
+) -> List[CONLLUTree]:
+    return _worker_inventory.make_trees(texts, lang)[0]
+
+
+def _make_lines_chunk(
+        texts: List[str], lang: Optional[str] = None
+) -> List[str]:
+    trees = _worker_inventory.make_trees(texts, lang)[0]
+    return [str(tree) for tree in trees]
+
+
+def _rewrite_chunk(texts: List[str], lang: Optional[str] = None) -> List[str]:
+    return [_worker_inventory.rewrite_text(text, lang) for text in texts]
+
+
+def _build_trees(
+        inventory: Inventory,
+        words: List[LexItem],
+        ignore_errors: bool
+) -> List[Tuple[LexItem, CONLLUTree]]:
+    built = []
+    for word in words:
+        try:
+            built.append((word, inventory._build_subword_tree(word)))
+        except Exception as e:
+            if not ignore_errors:
+                raise
+            print(e)
+    return built
+
+
+def _build_trees_chunk(
+        task: Tuple[List[LexItem], Dict[LexItem, CONLLUTree], bool]
+) -> List[Tuple[LexItem, CONLLUTree]]:
+    words, parent_trees, ignore_errors = task
+    inventory = _worker_inventory
+    word_trees = inventory.word_trees
+    # the trees of the previous levels are sent along with the task
+    inventory.word_trees = ChainMap(parent_trees, word_trees)
+    try:
+        return _build_trees(inventory, words, ignore_errors)
+    finally:
+        inventory.word_trees = word_trees
+
+
+def _iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def unite_inventories(*inventories: Inventory, lazy: bool = True) -> Inventory:
+    """
+    Unites the inventories; for equal keys the later inventories win.
+
+    By default the result is a layered view over the source inventories:
+    its dicts are `ChainMap`s, so nothing is copied, changes of the sources
+    are visible in the view, and new entries go to the own top layer.
+    Use `Inventory.compact` or `lazy=False` to get plain dicts instead.
+    """
     bracketing_strategy, = set(
         inventory.bracketing_strategy
         for inventory in inventories
     )
+    if not lazy:
+        rules_by_ids = {}
+        word_analyses = {}
+        word_trees = {}
+        for inventory in inventories:
+            rules_by_ids.update(inventory.rules_by_ids)
+            word_analyses.update(inventory.word_analyses)
+            word_trees.update(inventory.word_trees)
+        return Inventory(
+            rules_by_ids=rules_by_ids,
+            word_analyses=word_analyses,
+            word_trees=word_trees,
+            bracketing_strategy=bracketing_strategy
+        )
+
+    layers = list(reversed(inventories))
     return Inventory(
-        rules_by_ids=rules_by_ids,
-        word_analyses=word_analyses,
-        word_trees=word_trees,
+        rules_by_ids=ChainMap({}, *[i.rules_by_ids for i in layers]),
+        word_analyses=ChainMap({}, *[i.word_analyses for i in layers]),
+        word_trees=ChainMap({}, *[i.word_trees for i in layers]),
         bracketing_strategy=bracketing_strategy
     )
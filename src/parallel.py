@@ -0,0 +1,30 @@
+import multiprocessing
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+def map_ordered(
+        func: Callable[..., Any],
+        tasks: Iterable[tuple],
+        n_workers: int,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = ()
+) -> Iterator[Any]:
+    """
+    Calls `func(*args)` for each task in a process pool
+    and yields the results in the order of the tasks.
+    The tasks are submitted with `apply_async`, and at most 2 * `n_workers`
+    of them are in flight at a time, so `tasks` can be a lazy iterator
+    over a large input and the memory does not grow with its size.
+    """
+    max_pending = 2 * n_workers
+    with multiprocessing.Pool(
+        n_workers, initializer=initializer, initargs=initargs
+    ) as pool:
+        pending = deque()
+        for args in tasks:
+            pending.append(pool.apply_async(func, args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
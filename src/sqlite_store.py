@@ -0,0 +1,362 @@
+import os
+import pickle
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from itertools import chain
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from src.bloom import BloomFilter
+from src.deptree import LexItem, Inventory, make_lex_item, normalize_lemma
+
+
+LEX_FIELDS = ("lemma", "form", "upos", "xpos", "lid", "lang")
+
+# marks a cached negative lookup
+_MISSING = object()
+
+# the name of the saved `Inventory.lemma_filter`
+LEMMA_FILTER = "lemmas"
+
+
+def lex_key(word: LexItem) -> str:
+    # exact, since repr distinguishes None, int and str fields
+    return repr(tuple(getattr(word, name) for name in LEX_FIELDS))
+
+
+def lemma_key(lemma: Optional[str]) -> Optional[str]:
+    # the indexed form of a lemma for `SQLiteMapping.find`
+    if not isinstance(lemma, str):
+        return lemma
+    return normalize_lemma(lemma, casefold=True)
+
+
+class SQLiteMapping(MutableMapping):
+    """
+    A dict-like table of an `SQLiteInventoryStore`.
+    Values are pickled; recently read entries (and misses) are kept
+    in a small in-process LRU cache, as `Inventory` asks for the same
+    words many times (`in`, then `[]`).
+    """
+    def __init__(
+            self,
+            store: "SQLiteInventoryStore",
+            table: str,
+            is_lex_key: bool,
+            cache_size: int = 10000
+    ):
+        self.store = store
+        self.table = table
+        self.is_lex_key = is_lex_key
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def _key(self, key) -> str:
+        return lex_key(key) if self.is_lex_key else key
+
+    def _get(self, key) -> Any:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if self.is_lex_key and not isinstance(key, LexItem):
+            return _MISSING
+        row = self.store.connection.execute(
+            f"SELECT value FROM {self.table} WHERE key = ?",
+            (self._key(key),)
+        ).fetchone()
+        value = _MISSING if row is None else pickle.loads(row[0])
+        if self.cache_size:
+            self._cache[key] = value
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self._get(key) is not _MISSING
+
+    def __setitem__(self, key, value):
+        self.update_many([(key, value)])
+
+    def __delitem__(self, key):
+        cursor = self.store.connection.execute(
+            f"DELETE FROM {self.table} WHERE key = ?", (self._key(key),)
+        )
+        self._cache.pop(key, None)
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def update_many(
+            self,
+            items: Iterable[Tuple[Any, Any]],
+            batch_size: int = 10000
+    ) -> int:
+        """
+        Bulk insert of (key, value) pairs, e. g. streamed from a reader.
+        Returns the number of inserted pairs.
+        """
+        if self.is_lex_key:
+            columns = ", ".join(LEX_FIELDS)
+            query = (
+                f"INSERT OR REPLACE INTO {self.table} "
+                f"(key, value, {columns}, lemma_key) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            )
+        else:
+            query = (
+                f"INSERT OR REPLACE INTO {self.table} "
+                f"(key, value) VALUES (?, ?)"
+            )
+
+        n_items = 0
+        batch = []
+        with self.store.connection:
+            for key, value in items:
+                row = (self._key(key), pickle.dumps(value, protocol=-1))
+                if self.is_lex_key:
+                    row += tuple(getattr(key, name) for name in LEX_FIELDS)
+                    row += (lemma_key(key.lemma),)
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self.store.connection.executemany(query, batch)
+                    n_items += len(batch)
+                    batch = []
+            if batch:
+                self.store.connection.executemany(query, batch)
+                n_items += len(batch)
+            if self.is_lex_key and n_items:
+                # the saved lemma filter could reject the new words
+                self.store.connection.execute(
+                    "DELETE FROM filters WHERE name = ?", (LEMMA_FILTER,)
+                )
+        self._cache.clear()
+        return n_items
+
+    def update(self, other=(), **kwargs):
+        # a single batched transaction instead of per-item inserts,
+        # e. g. for reader.build_inventory(path, word_analyses=mapping)
+        if isinstance(other, Mapping):
+            other = other.items()
+        elif hasattr(other, "keys"):
+            other = ((key, other[key]) for key in other.keys())
+        self.update_many(chain(other, kwargs.items()))
+
+    def __len__(self) -> int:
+        row = self.store.connection.execute(
+            f"SELECT COUNT(*) FROM {self.table}"
+        ).fetchone()
+        return row[0]
+
+    def __iter__(self) -> Iterator:
+        if self.is_lex_key:
+            columns = ", ".join(LEX_FIELDS)
+            cursor = self.store.connection.execute(
+                f"SELECT {columns} FROM {self.table}"
+            )
+            for row in cursor:
+                yield make_lex_item(*row)
+        else:
+            cursor = self.store.connection.execute(
+                f"SELECT key FROM {self.table}"
+            )
+            for row, in cursor:
+                yield row
+
+    def find(
+            self,
+            lemma: str,
+            upos: Optional[str] = None,
+            lang: Optional[str] = None,
+            casefold: bool = False
+    ) -> Iterator[LexItem]:
+        """
+        Finds the stored words by a normalized lemma, upos and lang;
+        None matches any upos or lang, see `Inventory.resolve`.
+        """
+        assert self.is_lex_key
+        columns = ", ".join(LEX_FIELDS)
+        conditions = ["lemma_key = ?"]
+        args = [lemma_key(lemma)]
+        if lang is not None:
+            conditions.append("lang = ?")
+            args.append(lang)
+        if upos is not None:
+            conditions.append("upos = ?")
+            args.append(upos)
+        cursor = self.store.connection.execute(
+            f"SELECT {columns} FROM {self.table} "
+            f"WHERE {' AND '.join(conditions)}",
+            args
+        )
+        lemma = normalize_lemma(lemma, casefold)
+        for row in cursor:
+            word = make_lex_item(*row)
+            # the index is case folded
+            if normalize_lemma(word.lemma, casefold) == lemma:
+                yield word
+
+
+class SQLiteInventoryStore:
+    """
+    Out-of-core storage of inventory dicts in a local SQLite file.
+
+    store = SQLiteInventoryStore("deu.sqlite")
+    store.add_inventory(reader.build_inventory(path))
+    # or, streaming: store.word_analyses.update_many(pairs)
+    inventory = store.make_inventory()
+
+    `word_analyses` and `word_trees` are keyed by `LexItem` and indexed
+    on (lang, lemma, upos, form) and (normalized lemma, upos),
+    `rules_by_ids` is keyed by rule id.
+    """
+    TABLES = {
+        "rules_by_ids": False,
+        "word_analyses": True,
+        "word_trees": True,
+    }
+
+    def __init__(self, path: str, cache_size: int = 10000):
+        self.path = path
+        self.cache_size = cache_size
+        self._connect()
+        self._create_tables()
+
+        self.rules_by_ids = SQLiteMapping(
+            self, "rules_by_ids", is_lex_key=False, cache_size=cache_size
+        )
+        self.word_analyses = SQLiteMapping(
+            self, "word_analyses", is_lex_key=True, cache_size=cache_size
+        )
+        self.word_trees = SQLiteMapping(
+            self, "word_trees", is_lex_key=True, cache_size=cache_size
+        )
+
+    def _connect(self):
+        self._connection = sqlite3.connect(self.path)
+        self._pid = os.getpid()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # a forked worker (e. g. of `Inventory.iter_trees`) must not use
+        # the connection of its parent, so it opens its own
+        if self._pid != os.getpid():
+            self._connect()
+        return self._connection
+
+    def _create_tables(self):
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS filters "
+                "(name TEXT PRIMARY KEY, value BLOB)"
+            )
+            for table, is_lex_key in self.TABLES.items():
+                if not is_lex_key:
+                    self.connection.execute(
+                        f"CREATE TABLE IF NOT EXISTS {table} "
+                        f"(key TEXT PRIMARY KEY, value BLOB)"
+                    )
+                    continue
+                # untyped columns keep int and str values (e. g. `lid`)
+                self.connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    f"(key TEXT PRIMARY KEY, value BLOB, "
+                    f"{', '.join(LEX_FIELDS)})"
+                )
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_lex "
+                    f"ON {table} (lang, lemma, upos, form)"
+                )
+                columns = [
+                    row[1] for row in self.connection.execute(
+                        f"PRAGMA table_info({table})"
+                    )
+                ]
+                if "lemma_key" not in columns:
+                    # also fills the stores of older versions
+                    self.connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN lemma_key"
+                    )
+                    self.connection.create_function(
+                        "lemma_key", 1, lemma_key, deterministic=True
+                    )
+                    self.connection.execute(
+                        f"UPDATE {table} SET lemma_key = lemma_key(lemma)"
+                    )
+                # for `SQLiteMapping.find`
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_lemma_key "
+                    f"ON {table} (lemma_key, upos)"
+                )
+
+    def make_inventory(
+            self,
+            bracketing_strategy: str = "last",
+            use_lemma_filter: bool = False
+    ) -> Inventory:
+        """
+        With `use_lemma_filter`, the inventory skips the lookups
+        of most missing words, see `get_lemma_filter`.
+        """
+        return Inventory(
+            rules_by_ids=self.rules_by_ids,
+            word_analyses=self.word_analyses,
+            word_trees=self.word_trees,
+            bracketing_strategy=bracketing_strategy,
+            lemma_filter=self.get_lemma_filter() if use_lemma_filter else None
+        )
+
+    def get_lemma_filter(self, error_rate: float = 0.01) -> BloomFilter:
+        """
+        The Bloom filter of the stored lemmas. It is saved in the store
+        and rebuilt after the words are changed.
+        """
+        row = self.connection.execute(
+            "SELECT value FROM filters WHERE name = ?", (LEMMA_FILTER,)
+        ).fetchone()
+        if row is not None:
+            return BloomFilter.from_bytes(row[0])
+
+        cursor = self.connection.execute(
+            "SELECT lemma FROM word_analyses "
+            "UNION SELECT lemma FROM word_trees"
+        )
+        lemma_filter = Inventory.make_lemma_filter(
+            (lemma for lemma, in cursor), error_rate
+        )
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO filters (name, value) VALUES (?, ?)",
+                (LEMMA_FILTER, lemma_filter.to_bytes())
+            )
+        return lemma_filter
+
+    def add_inventory(self, inventory: Inventory, batch_size: int = 10000):
+        """
+        Bulk copies an in-memory inventory into the store.
+        """
+        for name in self.TABLES:
+            getattr(self, name).update_many(
+                getattr(inventory, name).items(), batch_size=batch_size
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        # worker processes open their own connection
+        return {"path": self.path, "cache_size": self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["cache_size"])
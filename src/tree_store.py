@@ -0,0 +1,343 @@
+import mmap
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+from hashlib import blake2b
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from src.bloom import BloomFilter
+from src.deptree import (
+    LexItem, CONLLUToken, CONLLUTree, Inventory, make_lex_item,
+    normalize_lemma
+)
+
+
+MAGIC = b"WFDTTS01"
+
+LEX_FIELDS = ("lemma", "form", "upos", "xpos", "lid", "lang")
+TOKEN_STR_FIELDS = (
+    "form", "lemma", "upos", "xpos", "feats", "deprel", "deps", "misc"
+)
+
+# per key: LexItem fields, int fields flags, root_idx, sent_id, sent_text
+KEY_WIDTH = len(LEX_FIELDS) + 4
+# per token: idx, head and the string fields
+TOKEN_WIDTH = 2 + len(TOKEN_STR_FIELDS)
+
+# header: magic, then version, byte order, n_strings, n_keys, n_tokens
+# and the positions of the eight sections
+HEADER_FIELDS = 13
+HEADER_SIZE = len(MAGIC) + 8 * HEADER_FIELDS
+VERSION = 2
+NONE_ID = -1
+
+# the lemma filter is saved next to the store file
+LEMMA_FILTER_SUFFIX = ".lemmas.bloom"
+
+
+def key_hash(word: LexItem) -> int:
+    """
+    A hash of the word that is stable across processes and runs.
+    """
+    values = tuple(getattr(word, name) for name in LEX_FIELDS)
+    digest = blake2b(repr(values).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def lemma_hash(lemma: str) -> int:
+    """
+    A stable hash of the normalized, case folded lemma, see `TreeStore.find`.
+    """
+    lemma = normalize_lemma(lemma, casefold=True)
+    digest = blake2b(lemma.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _pad(f, pos: int) -> int:
+    padding = -pos % 8
+    f.write(b"\0" * padding)
+    return pos + padding
+
+
+class TreeStore(Mapping):
+    """
+    A read-only, memory-mapped store of precompiled subword trees,
+    a drop-in replacement for `Inventory.word_trees`:
+
+    TreeStore.write("trees.bin", inventory.word_trees)
+    inventory = Inventory(word_trees=TreeStore("trees.bin"))
+
+    The file consists of a string table, a sorted table of key hashes,
+    key records, flat int arrays of token ids, heads and string ids,
+    and a sorted table of lemma hashes for `find`.
+    Nothing is decoded until a tree is requested, and processes which open
+    the same file share its pages in the OS page cache.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(
+            self._file.fileno(), 0, access=mmap.ACCESS_READ
+        )
+        self._view = view = memoryview(self._mmap)
+
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a subword tree store!")
+        header = view[len(MAGIC):HEADER_SIZE].cast("Q")
+        (
+            version, is_little, n_strings, self._n_keys, n_tokens,
+            str_offsets_pos, str_blob_pos, hashes_pos, keys_pos,
+            tok_offsets_pos, tokens_pos, lemma_hashes_pos, lemma_keys_pos
+        ) = header
+        if version != VERSION:
+            raise ValueError(f"Unsupported tree store version {version}!")
+        if bool(is_little) != (sys.byteorder == "little"):
+            raise ValueError(f"{path} was written with another byte order!")
+
+        def section(pos: int, fmt: str, n: int):
+            size = array(fmt).itemsize
+            return view[pos:pos + n * size].cast(fmt)
+
+        self._str_offsets = section(str_offsets_pos, "Q", n_strings + 1)
+        self._str_blob_pos = str_blob_pos
+        self._hashes = section(hashes_pos, "Q", self._n_keys)
+        self._keys = section(keys_pos, "i", self._n_keys * KEY_WIDTH)
+        self._tok_offsets = section(tok_offsets_pos, "Q", self._n_keys + 1)
+        self._tokens = section(tokens_pos, "i", n_tokens * TOKEN_WIDTH)
+        # the key numbers sorted by the hashes of their lemmas
+        self._lemma_hashes = section(lemma_hashes_pos, "Q", self._n_keys)
+        self._lemma_keys = section(lemma_keys_pos, "i", self._n_keys)
+
+    def _string(self, i: int) -> Optional[str]:
+        if i == NONE_ID:
+            return None
+        start = self._str_blob_pos + self._str_offsets[i]
+        end = self._str_blob_pos + self._str_offsets[i + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+    def _decode_key(self, k: int) -> LexItem:
+        record = self._keys[k * KEY_WIDTH:(k + 1) * KEY_WIDTH]
+        int_flags = record[len(LEX_FIELDS)]
+        values = []
+        for i in range(len(LEX_FIELDS)):
+            value = self._string(record[i])
+            if int_flags & (1 << i):
+                value = int(value)
+            values.append(value)
+        return make_lex_item(*values)
+
+    def _decode_tree(self, k: int) -> CONLLUTree:
+        record = self._keys[k * KEY_WIDTH:(k + 1) * KEY_WIDTH]
+        root_idx, sent_id, sent_text = record[len(LEX_FIELDS) + 1:]
+        tokens = []
+        for t in range(self._tok_offsets[k], self._tok_offsets[k + 1]):
+            row = self._tokens[t * TOKEN_WIDTH:(t + 1) * TOKEN_WIDTH]
+            idx, head, *str_ids = row
+            fields = {
+                name: self._string(i)
+                for name, i in zip(TOKEN_STR_FIELDS, str_ids)
+            }
+            tokens.append(CONLLUToken(idx=str(idx), head=str(head), **fields))
+        return CONLLUTree(
+            tokens,
+            sent_id=self._string(sent_id),
+            sent_text=self._string(sent_text),
+            root_idx=root_idx
+        )
+
+    def _find(self, word: LexItem) -> Optional[int]:
+        h = key_hash(word)
+        lo = self._bisect(self._hashes, h)
+        while lo < self._n_keys and self._hashes[lo] == h:
+            if self._decode_key(lo) == word:
+                return lo
+            lo += 1
+        return None
+
+    def _bisect(self, hashes, h: int) -> int:
+        lo, hi = 0, self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if hashes[mid] < h:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(
+            self,
+            lemma: str,
+            upos: Optional[str] = None,
+            lang: Optional[str] = None,
+            casefold: bool = False
+    ) -> Iterator[LexItem]:
+        """
+        Finds the stored words by a normalized lemma, upos and lang;
+        None matches any upos or lang, see `Inventory.resolve`.
+        """
+        h = lemma_hash(lemma)
+        lemma = normalize_lemma(lemma, casefold)
+        i = self._bisect(self._lemma_hashes, h)
+        while i < self._n_keys and self._lemma_hashes[i] == h:
+            word = self._decode_key(self._lemma_keys[i])
+            i += 1
+            if normalize_lemma(word.lemma, casefold) != lemma:
+                continue
+            if upos is not None and word.upos != upos:
+                continue
+            if lang is not None and word.lang != lang:
+                continue
+            yield word
+
+    def __getitem__(self, word: LexItem) -> CONLLUTree:
+        k = self._find(word) if isinstance(word, LexItem) else None
+        if k is None:
+            raise KeyError(word)
+        return self._decode_tree(k)
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, LexItem) and self._find(word) is not None
+
+    def __len__(self) -> int:
+        return self._n_keys
+
+    def __iter__(self) -> Iterator[LexItem]:
+        for k in range(self._n_keys):
+            yield self._decode_key(k)
+
+    def close(self):
+        for name in (
+            "_str_offsets", "_hashes", "_keys", "_tok_offsets", "_tokens",
+            "_lemma_hashes", "_lemma_keys", "_view"
+        ):
+            getattr(self, name).release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        # worker processes reopen the file instead of copying its content
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def get_lemma_filter(self) -> Optional[BloomFilter]:
+        """
+        The filter of the stored lemmas, if it was written, e. g.
+        Inventory(word_trees=store, lemma_filter=store.get_lemma_filter())
+        """
+        filter_path = self.path + LEMMA_FILTER_SUFFIX
+        if not os.path.isfile(filter_path):
+            return None
+        return BloomFilter.load(filter_path)
+
+    @staticmethod
+    def write(
+            path: str,
+            word_trees: Union[Dict[LexItem, CONLLUTree], Mapping],
+            lemma_filter_error_rate: Optional[float] = 0.01
+    ) -> int:
+        """
+        Writes the trees to a store file. Returns the number of trees.
+        Unless `lemma_filter_error_rate` is None, the Bloom filter
+        of the lemmas is written as well.
+        """
+        string_ids: Dict[str, int] = {}
+        strings: List[bytes] = []
+
+        def string_id(value: Optional[str]) -> int:
+            if value is None:
+                return NONE_ID
+            i = string_ids.get(value)
+            if i is None:
+                i = string_ids[value] = len(strings)
+                strings.append(value.encode("utf-8"))
+            return i
+
+        items: List[Tuple[int, LexItem, CONLLUTree]] = sorted(
+            (
+                (key_hash(word), word, tree)
+                for word, tree in word_trees.items()
+            ),
+            key=lambda item: item[0]
+        )
+
+        hashes = array("Q")
+        keys = array("i")
+        tok_offsets = array("Q", [0])
+        tokens = array("i")
+        for h, word, tree in items:
+            hashes.append(h)
+            int_flags = 0
+            for i, name in enumerate(LEX_FIELDS):
+                value = getattr(word, name)
+                if isinstance(value, int):
+                    int_flags |= 1 << i
+                    value = str(value)
+                elif value is not None and not isinstance(value, str):
+                    raise TypeError(f"Unsupported {name} value in {word}!")
+                keys.append(string_id(value))
+            keys.extend([
+                int_flags,
+                tree.root_idx,
+                string_id(tree.sent_id),
+                string_id(tree.sent_text)
+            ])
+            for token in tree.tokens:
+                tokens.append(token.iidx)
+                tokens.append(token.ihead)
+                for name in TOKEN_STR_FIELDS:
+                    tokens.append(string_id(getattr(token, name)))
+            tok_offsets.append(tok_offsets[-1] + len(tree))
+
+        lemma_items = sorted(
+            (lemma_hash(word.lemma), k)
+            for k, (_, word, _) in enumerate(items)
+        )
+        lemma_hashes = array("Q", [h for h, _ in lemma_items])
+        lemma_keys = array("i", [k for _, k in lemma_items])
+
+        str_offsets = array("Q", [0])
+        for s in strings:
+            str_offsets.append(str_offsets[-1] + len(s))
+
+        with open(path, "wb") as f:
+            f.write(b"\0" * HEADER_SIZE)
+            pos = HEADER_SIZE
+            positions = []
+            for section in [
+                str_offsets, b"".join(strings), hashes, keys,
+                tok_offsets, tokens, lemma_hashes, lemma_keys
+            ]:
+                pos = _pad(f, pos)
+                positions.append(pos)
+                data = section if isinstance(section, bytes) \
+                    else section.tobytes()
+                f.write(data)
+                pos += len(data)
+
+            f.seek(0)
+            f.write(MAGIC)
+            f.write(array("Q", [
+                VERSION, int(sys.byteorder == "little"),
+                len(strings), len(items), len(tokens) // TOKEN_WIDTH,
+                *positions
+            ]).tobytes())
+
+        # the filter of an older store must not remain
+        filter_path = path + LEMMA_FILTER_SUFFIX
+        if lemma_filter_error_rate is None:
+            if os.path.isfile(filter_path):
+                os.remove(filter_path)
+        else:
+            Inventory.make_lemma_filter(
+                (word.lemma for _, word, _ in items), lemma_filter_error_rate
+            ).save(filter_path)
+        return len(items)
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from src import LexItem, WFToken
+from data_readers import (
+    DemonextReader, MorphyNetDerivationalReader,
+    WordFormationLatinSQLReader, WordFormationLatinXMLReader
+)
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+# there is no WFL XML sample in the repository
+WFL_XML = """<WFL>
+<Record><Analysis><Lemmas>
+<Lemma lemma="amator" is_derived="true">
+<Rule id="12" category="V-To-N" type="Derivation_Suffix" affix="-tor">
+<Source lemma="amo"/></Rule></Lemma>
+<Lemma lemma="amo" is_derived="false"/>
+</Lemmas></Analysis></Record>
+<Record><Analysis><Lemmas>
+<Lemma lemma="amor" is_derived="true">
+<Rule id="3" category="V-To-N" type="Derivation_Conversion">
+<Source lemma="amo"/></Rule></Lemma>
+<Lemma lemma="agricola" is_derived="true">
+<Rule id="7" category="N+V=N" type="Compounding">
+<Source lemma="ager"/><Source lemma="colo"/></Rule></Lemma>
+</Lemmas></Analysis></Record>
+</WFL>
+"""
+
+READERS = [
+    (DemonextReader, "fra", "fra/demonext/sample.txt"),
+    (MorphyNetDerivationalReader, "eng", "eng/morphynet-d/sample.txt"),
+    (WordFormationLatinSQLReader, "lat", "lat/lemlat3/sample.txt"),
+    (WordFormationLatinXMLReader, "lat", None),
+]
+
+
+class CountingDict(dict):
+    """Counts the reads of the entries, as a store would query them."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.n_reads = 0
+
+    def __getitem__(self, key):
+        self.n_reads += 1
+        return super().__getitem__(key)
+
+    def items(self):
+        self.n_reads += len(self)
+        return super().items()
+
+
+@pytest.mark.parametrize("reader_cls, lang, path", READERS)
+def test_rules_from_loaded_pairs_only(tmp_path, reader_cls, lang, path):
+    if path is None:
+        path = tmp_path / "wfl.xml"
+        path.write_text(WFL_XML)
+    path = os.path.join(DATA_DIR, path)
+    expected = reader_cls(lang).build_inventory(path)
+
+    # an entry of another reader with a rule id these readers can't parse
+    foreign = LexItem("Häuschen", "Häuschen", "NOUN")
+    sink = CountingDict({
+        foreign: WFToken(LexItem("Haus", "Haus", "NOUN"), "dNN01")
+    })
+    inventory = reader_cls(lang).build_inventory(path, word_analyses=sink)
+
+    assert inventory.rules_by_ids == expected.rules_by_ids
+    assert "dNN01" not in inventory.rules_by_ids
+    assert sink.n_reads == 0
+    assert sink[foreign].rule_id == "dNN01"
+    for k, v in expected.word_analyses.items():
+        assert sink[k] == v
+    assert len(sink) == len(expected.word_analyses) + 1
@@ -0,0 +1,98 @@
+from src import (
+    LexItem, WFToken, RuleInfo, Inventory, BloomFilter,
+    SQLiteInventoryStore, TreeStore
+)
+
+
+BASE = LexItem("Haus", "Haus", "NOUN")
+WORD = LexItem("Häuser", "Häuser", "NOUN")
+RULES = {"-er": RuleInfo("-er", "SFX", "NOUN", "NOUN")}
+
+
+def make_inventory(**kwargs) -> Inventory:
+    return Inventory(
+        rules_by_ids=dict(RULES),
+        word_analyses={WORD: WFToken(d_from=BASE, rule_id="-er")},
+        **kwargs
+    )
+
+
+def test_no_false_negatives():
+    values = [f"lemma{i}" for i in range(5000)]
+    bloom_filter = BloomFilter.from_values(values, error_rate=0.01)
+    assert all(value in bloom_filter for value in values)
+    false_positives = sum(
+        f"other{i}" in bloom_filter for i in range(20000)
+    )
+    assert false_positives < 20000 * 0.03
+
+
+def test_save_and_load(tmp_path):
+    bloom_filter = BloomFilter.from_values(["a", "b"])
+    loaded = BloomFilter.from_bytes(bloom_filter.to_bytes())
+    assert loaded.bits == bloom_filter.bits
+    assert loaded.n_hashes == bloom_filter.n_hashes
+
+    path = str(tmp_path / "lemmas.bloom")
+    bloom_filter.save(path)
+    assert "a" in BloomFilter.load(path)
+
+
+def test_filtered_words_get_single_token_trees():
+    inventory = make_inventory()
+    inventory.build_lemma_filter()
+    assert len(inventory.make_subword_tree(WORD)) == 2
+    # case folded, so that it suits any lookup_casefold
+    assert not inventory._is_filtered_out(LexItem("HÄUSER"))
+    hund = LexItem("Hund", "Hund", "NOUN")
+    assert inventory._is_filtered_out(hund)
+    assert len(inventory.make_subword_tree(hund)) == 1
+
+
+def test_clear_cache_keeps_given_filter():
+    given = Inventory.make_lemma_filter(["häuser"])
+    inventory = make_inventory(lemma_filter=given)
+    inventory.clear_cache()
+    assert inventory.lemma_filter is given
+
+
+def test_clear_cache_rebuilds_own_filter():
+    inventory = make_inventory()
+    inventory.build_lemma_filter()
+    new_word = LexItem("Häuschen", "Häuschen", "NOUN")
+    inventory.word_analyses[new_word] = WFToken(d_from=BASE, rule_id="-er")
+    inventory.clear_cache()
+    assert not inventory._is_filtered_out(new_word)
+    assert len(inventory.make_subword_tree(new_word)) == 2
+
+
+def test_sqlite_store_saves_filter(tmp_path):
+    path = str(tmp_path / "inv.sqlite")
+    with SQLiteInventoryStore(path) as store:
+        store.add_inventory(make_inventory())
+        inventory = store.make_inventory(use_lemma_filter=True)
+        assert "häuser" in inventory.lemma_filter
+        inventory.clear_cache()
+        assert inventory.lemma_filter is not None
+
+    with SQLiteInventoryStore(path) as store:
+        count = "SELECT COUNT(*) FROM filters"
+        assert store.connection.execute(count).fetchone() == (1,)
+        # new words drop the saved filter
+        hund = LexItem("Hund", "Hund", "NOUN")
+        store.word_analyses[hund] = WFToken(d_from=BASE)
+        assert store.connection.execute(count).fetchone() == (0,)
+        assert "hund" in store.get_lemma_filter()
+
+
+def test_tree_store_writes_filter(tmp_path):
+    inventory = make_inventory()
+    inventory.materialize_all()
+    path = str(tmp_path / "trees.bin")
+    TreeStore.write(path, inventory.word_trees)
+    with TreeStore(path) as store:
+        assert "häuser" in store.get_lemma_filter()
+
+    TreeStore.write(path, inventory.word_trees, lemma_filter_error_rate=None)
+    with TreeStore(path) as store:
+        assert store.get_lemma_filter() is None
@@ -0,0 +1,132 @@
+from copy import copy
+
+from src import (
+    LexItem, WFToken, RuleInfo, Inventory,
+    CONLLUToken, CONLLUTree, ColumnarCONLLUTree
+)
+
+
+def make_tree(text: str) -> CONLLUTree:
+    return CONLLUTree.from_text(text)
+
+
+TEXT = "\n".join([
+    "1\tin-\tin-\tADJ\t_\t_\t2\tderiv\t_\t_",
+    "2\tdefinite\tdefinite\tADJ\t_\t_\t0\troot\t_\t_",
+])
+
+
+def test_round_trip():
+    tree = make_tree(TEXT)
+    columnar = ColumnarCONLLUTree.from_tree(tree)
+    assert str(columnar) == str(tree)
+    assert str(columnar.to_tree()) == str(tree)
+    assert columnar.root_idx == tree.root_idx
+
+
+def test_token_view_copy_is_detached():
+    columnar = ColumnarCONLLUTree.from_text(TEXT)
+    token = copy(columnar[1])
+    assert isinstance(token, CONLLUToken)
+    token.set_idx(5)
+    token.deprel = "conj"
+    assert columnar[1].idx == "2"
+    assert columnar[1].deprel == "root"
+
+
+def test_merge_matches_plain_trees():
+    tree_l = make_tree(TEXT)
+    tree_r = make_tree("1\t-ly\t-ly\tADV\t_\t_\t0\troot\t_\t_")
+    expected = Inventory.merge_trees(tree_l, tree_r, "deriv")
+    merged = Inventory.merge_trees(
+        ColumnarCONLLUTree.from_tree(tree_l), tree_r, "deriv"
+    )
+    assert isinstance(merged, ColumnarCONLLUTree)
+    assert [str(t) for t in merged.tokens] == \
+        [str(t) for t in expected.tokens]
+
+
+def test_stored_columnar_tree_is_not_modified():
+    base = LexItem("definite", "definite", "ADJ")
+    word = LexItem("indefinite", "indefinite", "ADJ")
+    stored = ColumnarCONLLUTree.from_tree(
+        Inventory._make_single_token_tree(base)
+    )
+    before = str(stored)
+    inventory = Inventory(
+        rules_by_ids={"in-": RuleInfo("in-", "PFX", "ADJ", "ADJ")},
+        word_analyses={word: WFToken(d_from=base, rule_id="in-")},
+        word_trees={base: stored},
+    )
+    tree = inventory.make_subword_tree(word)
+    assert [token.form for token in tree.tokens] == ["in-", "definite"]
+    assert str(stored) == before
+
+    inventory.make_tree("1\tdefinite\tdefinite\tADJ\t_\t_\t0\troot\t_\t_")
+    assert str(stored) == before
+
+
+def make_derivation_inventory(word_trees) -> Inventory:
+    def lex(lemma, upos):
+        return LexItem(lemma, lemma, upos)
+
+    return Inventory(
+        rules_by_ids={
+            "in-": RuleInfo("in-", "PFX", "ADJ", "ADJ"),
+            "-ly": RuleInfo("-ly", "SFX", "ADJ", "ADV"),
+        },
+        word_analyses={
+            lex("indefinite", "ADJ"):
+                WFToken(d_from=lex("definite", "ADJ"), rule_id="in-"),
+            lex("indefinitely", "ADV"):
+                WFToken(d_from=lex("indefinite", "ADJ"), rule_id="-ly"),
+        },
+        word_trees=word_trees,
+    )
+
+
+BASE_TREE = "\n".join([
+    "1\tde-\tde-\tADJ\t_\t_\t2\tderiv\t_\t_",
+    "2\tfinite\tfinite\tADJ\t_\t_\t0\troot\t_\t_",
+])
+
+SENTENCE = "\n".join([
+    "# sent_id = 1",
+    "# text = indefinitely definite",
+    "1\tindefinitely\tindefinitely\tADV\t_\t_\t2\tadvmod\t_\t_",
+    "2\tdefinite\tdefinite\tADJ\t_\t_\t0\troot\t_\t_",
+])
+
+
+def test_columnar_trees_stay_columnar():
+    base = LexItem("definite", "definite", "ADJ")
+    word = LexItem("indefinitely", "indefinitely", "ADV")
+    plain = make_derivation_inventory({base: make_tree(BASE_TREE)})
+    stored = ColumnarCONLLUTree.from_text(BASE_TREE)
+    before = str(stored)
+    columnar = make_derivation_inventory({base: stored})
+
+    # rule application goes through `CONLLUTreeBuilder.build`
+    tree = columnar.make_subword_tree(word)
+    assert isinstance(tree, ColumnarCONLLUTree)
+    assert str(tree) == str(plain.make_subword_tree(word))
+    assert tree.root_idx == plain.make_subword_tree(word).root_idx
+
+    # and the sentence is renumbered by `concat`
+    tree = columnar.make_tree(SENTENCE)
+    assert isinstance(tree, ColumnarCONLLUTree)
+    assert str(tree) == str(plain.make_tree(SENTENCE))
+    assert str(stored) == before
+
+
+def test_concat_keeps_root_heads_and_attaches_arcs():
+    tree_l = ColumnarCONLLUTree.from_text(BASE_TREE)
+    tree_r = make_tree("1\t-ly\t-ly\tADV\t_\t_\t0\troot\t_\t_")
+    tree = ColumnarCONLLUTree.concat(
+        [tree_l, tree_r, tree_l], [(4, 1, "compound"), (2, -1, "root")]
+    )
+    assert list(tree.idx_column) == [1, 2, 3, 4, 5]
+    assert list(tree.head_column) == [2, 0, 0, 5, 2]
+    assert tree.str_columns["deprel"] == \
+        ["deriv", "root", "root", "deriv", "compound"]
+    assert tree.root_idx == 2
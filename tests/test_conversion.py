@@ -0,0 +1,170 @@
+import io
+
+import pytest
+
+from src import LexItem, WFToken, RuleInfo, Inventory
+
+
+RULES = {
+    "-able": RuleInfo("-able", "SFX", "NOUN", "ADJ"),
+    "-ite": RuleInfo("-ite", "SFX", "VERB", "ADV"),
+    "-ly": RuleInfo("-ly", "SFX", "ADJ", "ADV"),
+    "in-": RuleInfo("in-", "PFX", "ADJ", "ADJ"),
+}
+
+
+def make_inventory(lang=None, **kwargs) -> Inventory:
+    def lex(lemma, upos):
+        return LexItem(lemma, lemma, upos, lang=lang)
+
+    analyses = {
+        lex("comfortable", "ADJ"):
+            WFToken(d_from=lex("comfort", "NOUN"), rule_id="-able"),
+        lex("definite", "ADJ"):
+            WFToken(d_from=lex("define", "VERB"), rule_id="-ite"),
+        lex("indefinite", "ADJ"):
+            WFToken(d_from=lex("definite", "ADJ"), rule_id="in-"),
+        lex("indefinitely", "ADV"):
+            WFToken(d_from=lex("indefinite", "ADJ"), rule_id="-ly"),
+    }
+    return Inventory(rules_by_ids=RULES, word_analyses=analyses, **kwargs)
+
+
+SENTENCE = "\n".join([
+    "# sent_id = 1",
+    "# text = held indefinitely, in comfortable custody.",
+    "1\theld\thold\tVERB\tVBN\t_\t0\troot\t0:root\t_",
+    "2\tindefinitely\tindefinitely\tADV\tRB\t_\t1\tadvmod\t1:advmod\t_",
+    "3\t,\t,\tPUNCT\t,\t_\t1\tpunct\t1:punct\t_",
+    "4\tin\tin\tADP\tIN\t_\t6\tcase\t6:case\t_",
+    "5\tcomfortable\tcomfortable\tADJ\tJJ\tDegree=Pos\t6\tamod\t6:amod\t_",
+    "6\tcustody\tcustody\tNOUN\tNN\t_\t1\tobl\t1:obl:in\tSpaceAfter=No",
+    "7\t.\t.\tPUNCT\t.\t_\t1\tpunct\t1:punct\t_",
+])
+
+ENHANCED = "\n".join([
+    "# sent_id = 2",
+    "1-2\tindefinitely,\t_\t_\t_\t_\t_\t_\t_\t_",
+    "1\tindefinitely\tindefinitely\tADV\tRB\t_\t3\tadvmod\t3:advmod\t_",
+    "2\t,\t,\tPUNCT\t,\t_\t1\tpunct\t1.1:punct\t_",
+    "2.1\theld\thold\tVERB\t_\t_\t_\t_\t1:conj\t_",
+    "3\tcomfortable\tcomfortable\tADJ\tJJ\t_\t0\troot\t0:root\t_",
+])
+
+
+def columns(text: str, *indices: int):
+    return [
+        tuple(line.split("\t")[i] for i in indices)
+        for line in text.split("\n") if not line.startswith("#")
+    ]
+
+
+def test_rewrite_text_matches_make_tree():
+    inventory = make_inventory()
+    tree = str(inventory.make_tree(SENTENCE))
+    text = inventory.rewrite_text(SENTENCE)
+    # make_tree does not keep XPOS, FEATS, DEPS and MISC
+    assert columns(text, 0, 1, 2, 3, 6, 7) == columns(tree, 0, 1, 2, 3, 6, 7)
+
+
+def test_rewrite_text_keeps_arcs_of_expanded_words():
+    text = make_inventory().rewrite_text(SENTENCE).split("\n")
+    assert text[:2] == SENTENCE.split("\n")[:2]
+    # indefinitely -> in- define -ite -ly, rooted in define (3)
+    assert text[4].split("\t") == [
+        "3", "define", "define", "VERB", "_", "_", "1", "advmod",
+        "1:advmod", "_"
+    ]
+    assert text[5].split("\t")[8] == "_"
+    # the untouched columns are copied, the ids of custody are shifted
+    assert text[-2].split("\t") == [
+        "10", "custody", "custody", "NOUN", "NN", "_", "1", "obl",
+        "1:obl:in", "SpaceAfter=No"
+    ]
+
+
+def test_rewrite_text_renumbers_ranges_and_empty_nodes():
+    text = make_inventory().rewrite_text(ENHANCED).split("\n")
+    assert columns("\n".join(text), 0, 6, 8) == [
+        ("1-5", "_", "_"),
+        ("1", "2", "_"),
+        ("2", "6", "6:advmod"),
+        ("3", "2", "_"),
+        ("4", "2", "_"),
+        ("5", "2", "4.1:punct"),
+        ("5.1", "_", "2:conj"),
+        ("6", "0", "0:root"),
+        ("7", "6", "_"),
+    ]
+
+
+def test_rewrite_text_without_hits_is_unchanged():
+    text = "1\tcustody\tcustody\tNOUN\tNN\t_\t0\troot\t0:root\t_"
+    assert make_inventory().rewrite_text(text) is text
+
+
+def test_make_trees_matches_make_tree():
+    inventory = make_inventory()
+    trees, stats = inventory.make_trees([SENTENCE, SENTENCE])
+    expected = str(inventory.make_tree(SENTENCE))
+    assert [str(tree) for tree in trees] == [expected, expected]
+    assert stats == {
+        "tokens": 14, "distinct": 7, "hits": 2, "expansions": 4
+    }
+    # the shared subword trees are not modified by the batch
+    assert str(inventory.make_trees([SENTENCE])[0][0]) == expected
+
+
+def test_make_tree_skips_empty_nodes_and_keeps_comments():
+    text = "# newdoc id = d1\n" + ENHANCED + "\n# trailing = note"
+    tree = make_inventory().make_tree(text)
+    # the empty node 2.1 is dropped
+    assert columns(str(tree), 1, 6) == [
+        ("in-", "2"), ("define", "6"), ("-ite", "2"), ("-ly", "2"),
+        (",", "2"), ("comfort", "0"), ("-able", "6"),
+    ]
+    assert str(tree).split("\n")[:4] == [
+        "# newdoc id = d1",
+        "# sent_id = 2",
+        "# text = indefinitely , comfortable",
+        "# trailing = note",
+    ]
+
+
+@pytest.mark.parametrize("raw", [False, True])
+def test_lang_is_forwarded(raw):
+    inventory = make_inventory(lang="eng")
+    for lang, is_found in [(None, True), ("eng", True), ("deu", False)]:
+        output = io.StringIO()
+        inventory.write_trees(
+            io.StringIO(SENTENCE), output, raw=raw, lang=lang
+        )
+        assert ("comfort\t" in output.getvalue()) == is_found
+    assert [str(tree) for tree in inventory.iter_trees(
+        io.StringIO(SENTENCE), lang="deu"
+    )] == [str(inventory.make_tree(SENTENCE, lang="deu"))]
+
+
+@pytest.mark.parametrize("raw", [False, True])
+@pytest.mark.parametrize("lang", [None, "eng"])
+def test_parallel_output_matches_serial(raw, lang):
+    inventory = make_inventory(lang=lang)
+    document = "\n\n".join([SENTENCE, ENHANCED] * 5) + "\n"
+    serial = io.StringIO()
+    n_serial = inventory.write_trees(
+        io.StringIO(document), serial, chunk_size=3, raw=raw, lang=lang
+    )
+    parallel = io.StringIO()
+    n_parallel = inventory.write_trees(
+        io.StringIO(document), parallel, n_workers=2, chunk_size=3,
+        raw=raw, lang=lang
+    )
+    assert n_serial == n_parallel == 10
+    assert serial.getvalue() == parallel.getvalue()
+    if raw:
+        return
+    assert [str(t) for t in inventory.iter_trees(
+        io.StringIO(document), n_workers=2, chunk_size=3, lang=lang
+    )] == [str(t) for t in inventory.iter_trees(
+        io.StringIO(document), lang=lang
+    )]
@@ -0,0 +1,53 @@
+import os
+import pickle
+
+from data_readers import MorphyNetDerivationalReader
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def test_dataset_cache(tmp_path, monkeypatch):
+    path = tmp_path / "morphynet.txt"
+    with open(
+            os.path.join(DATA_DIR, "eng", "morphynet-d", "sample.txt")
+    ) as f:
+        path.write_text(f.read())
+    path = str(path)
+    cache_dir = str(tmp_path / "cache")
+
+    reader = MorphyNetDerivationalReader("eng", cache_dir=cache_dir)
+    expected = list(reader.iter_dataset(path))
+    assert list(reader.load_dataset(path)) == expected
+    assert len(dict(expected)) < len(expected)
+    cache_path, = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cache_path), "rb") as f:
+        _, dataset = pickle.load(f)
+    # the last pair of a repeated word wins
+    expected = list(dict(expected).items())
+    assert list(dataset.items()) == expected
+
+    # the cached dataset is read without parsing
+    def fail(*args, **kwargs):
+        raise AssertionError("the dataset is parsed again")
+    with monkeypatch.context() as m:
+        m.setattr(MorphyNetDerivationalReader, "iter_dataset", fail)
+        cached = list(reader.load_dataset(path))
+    assert cached == expected
+    assert hash(cached[0][0]) == hash(expected[0][0])
+    # the runtime options share the entry
+    other = MorphyNetDerivationalReader(
+        "eng", cache_dir=cache_dir, n_workers=2
+    )
+    with monkeypatch.context() as m:
+        m.setattr(MorphyNetDerivationalReader, "iter_dataset", fail)
+        assert list(other.load_dataset(path)) == expected
+
+    # a changed file is parsed again
+    with open(path) as f:
+        lines = f.read().splitlines()
+    with open(path, "w") as f:
+        f.write("\n".join(lines[:-1]) + "\n")
+    assert list(reader.load_dataset(path)) == \
+        list(reader.iter_dataset(path))
+    assert dict(reader.load_dataset(path)) != dict(expected)
@@ -0,0 +1,8 @@
+import pytest
+
+from data_readers.inventory_loader import build_inventories
+
+
+def test_build_inventories_without_specs():
+    with pytest.raises(ValueError, match="No sources"):
+        build_inventories([])
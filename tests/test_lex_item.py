@@ -0,0 +1,55 @@
+import gc
+import pickle
+import tracemalloc
+
+from src import LexItem, WFToken, make_lex_item
+
+
+def read_pairs(factory, n_bases=10000, n_derivatives=4):
+    # strings split from lines, as the readers get them:
+    # each base lemma is repeated over its derivatives
+    lines = [
+        f"base{i}\tbase{i}der{j}\tNOUN\tADJ"
+        for i in range(n_bases) for j in range(n_derivatives)
+    ]
+    pairs = {}
+    for line in lines:
+        b, a, pos_b, pos_a = line.split("\t")
+        pairs[factory(a, a, pos_a, lang="eng")] = WFToken(
+            factory(b, b, pos_b, lang="eng")
+        )
+    return pairs
+
+
+def measure(factory) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        pairs = read_pairs(factory)
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del pairs
+    return size
+
+
+def test_make_lex_item_saves_memory():
+    assert read_pairs(make_lex_item) == read_pairs(LexItem)
+    plain, shared = measure(LexItem), measure(make_lex_item)
+    assert shared < 0.95 * plain, (plain, shared)
+
+
+def test_make_lex_item_shares_strings():
+    a = make_lex_item("".join(["Ha", "us"]), upos="NOUN")
+    b = make_lex_item("".join(["Hau", "s"]), upos="NOUN")
+    assert a == b and hash(a) == hash(b)
+    assert a.lemma is b.lemma
+
+
+def test_pickle_round_trip():
+    word = LexItem("Haus", "Häuser", "NOUN", lid="1.0", lang="deu")
+    restored = pickle.loads(pickle.dumps(word))
+    assert restored == word
+    assert hash(restored) == hash(word)
+    assert {word: 1}[restored] == 1
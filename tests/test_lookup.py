@@ -0,0 +1,140 @@
+from src import (
+    LexItem, WFToken, RuleInfo, Inventory, SQLiteInventoryStore, TreeStore,
+    unite_inventories
+)
+
+
+BASE = LexItem("comfort", "comfort", "NOUN", lang="eng")
+WORD = LexItem("comfortable", "comfortable", "ADJ", lang="eng")
+RULES = {"-able": RuleInfo("-able", "SFX", "NOUN", "ADJ")}
+ANALYSES = {WORD: WFToken(d_from=BASE, rule_id="-able")}
+
+
+def make_inventory(**kwargs) -> Inventory:
+    return Inventory(
+        rules_by_ids=dict(RULES), word_analyses=dict(ANALYSES), **kwargs
+    )
+
+
+def test_lemma_upos_ignores_form_and_lang():
+    inventory = make_inventory()
+    assert inventory.resolve(LexItem("comfortable", "Comfortable", "ADJ")) \
+        == WORD
+    assert inventory.resolve(
+        LexItem("comfortable", "comfortable", "ADJ", lang="deu")
+    ) is None
+
+
+def test_lemma_only_matching_is_opt_in():
+    query = LexItem("comfortable", "comfortable", "VERB")
+    assert make_inventory().resolve(query) is None
+    tree = make_inventory().make_subword_tree(query)
+    assert len(tree) == 1
+
+    inventory = make_inventory(lookup_order=("exact", "lemma_upos", "lemma"))
+    assert inventory.resolve(query) == WORD
+
+
+def test_casefold():
+    query = LexItem("Comfortable", "Comfortable", "ADJ")
+    assert make_inventory().resolve(query) is None
+    assert make_inventory(lookup_casefold=True).resolve(query) == WORD
+
+
+def test_unknown_lookup_kind():
+    try:
+        make_inventory(lookup_order=("exact", "stem"))
+    except ValueError:
+        return
+    raise AssertionError("no error for an unknown lookup kind")
+
+
+def test_make_tree_uses_resolve():
+    tree = make_inventory().make_tree(
+        "1\tcomfortable\tcomfortable\tADJ\tJJ\t_\t0\troot\t_\t_"
+    )
+    assert [token.form for token in tree.tokens] == ["comfort", "-able"]
+
+
+QUERIES = [
+    # another form and no language
+    (LexItem("comfortable", "Comfortable", "ADJ"), {}, WORD),
+    (LexItem("comfortable", "comfortable", "VERB"), {}, None),
+    (
+        LexItem("comfortable", "comfortable", "VERB"),
+        {"lookup_order": ("exact", "lemma_upos", "lemma")},
+        WORD
+    ),
+    (LexItem("Comfortable", "Comfortable", "ADJ"), {}, None),
+    (
+        LexItem("Comfortable", "Comfortable", "ADJ"),
+        {"lookup_casefold": True},
+        WORD
+    ),
+    (LexItem("comfortable", "comfortable", "ADJ", lang="deu"), {}, None),
+]
+
+
+def check_queries(inventory: Inventory):
+    for query, options, expected in QUERIES:
+        if "lookup_order" in options:
+            inventory.lookup_order = options["lookup_order"]
+        inventory.lookup_casefold = options.get("lookup_casefold", False)
+        inventory.clear_cache()
+        assert inventory.resolve(query) == expected, (query, options)
+        inventory.lookup_order = ("exact", "lemma_upos")
+    # the stores are queried, not scanned into the index
+    assert inventory._lookup_index == {}
+
+
+def test_in_memory_matches_queries():
+    for query, options, expected in QUERIES:
+        assert make_inventory(**options).resolve(query) == expected
+
+
+def test_sqlite_store_is_queried_not_scanned(tmp_path):
+    with SQLiteInventoryStore(str(tmp_path / "inv.sqlite")) as store:
+        store.add_inventory(make_inventory())
+        check_queries(store.make_inventory())
+        # the store layer of a view
+        check_queries(unite_inventories(store.make_inventory(), Inventory()))
+
+
+def test_tree_store_is_queried_not_scanned(tmp_path):
+    inventory = make_inventory()
+    inventory.materialize_all()
+    path = str(tmp_path / "trees.bin")
+    TreeStore.write(path, inventory.word_trees)
+    with TreeStore(path) as store:
+        assert list(store.find("COMFORTABLE", casefold=True)) == [WORD]
+        assert list(store.find("COMFORTABLE")) == []
+        assert list(store.find("comfortable", "ADJ", "eng")) == [WORD]
+        assert list(store.find("comfortable", lang="deu")) == []
+        check_queries(Inventory(word_trees=store))
+        check_queries(
+            unite_inventories(Inventory(), Inventory(word_trees=store))
+        )
+
+
+def test_upper_layers_win():
+    other = LexItem("comfortable", "comfortable", "ADJ", lang="eng", lid=1)
+    upper = make_inventory()
+    upper.word_analyses = {other: ANALYSES[WORD]}
+    view = unite_inventories(make_inventory(), upper)
+    assert view.resolve(LexItem("comfortable", "x", "ADJ")) == other
+    view = unite_inventories(upper, make_inventory())
+    assert view.resolve(LexItem("comfortable", "x", "ADJ")) == WORD
+
+
+def test_older_sqlite_store_gets_lemma_keys(tmp_path):
+    path = str(tmp_path / "inv.sqlite")
+    with SQLiteInventoryStore(path) as store:
+        store.add_inventory(make_inventory())
+        with store.connection:
+            for table in ["word_analyses", "word_trees"]:
+                store.connection.execute(f"DROP INDEX {table}_lemma_key")
+                store.connection.execute(
+                    f"ALTER TABLE {table} DROP COLUMN lemma_key"
+                )
+    with SQLiteInventoryStore(path) as store:
+        check_queries(store.make_inventory())
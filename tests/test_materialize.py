@@ -0,0 +1,71 @@
+import pytest
+
+from src import LexItem, WFToken, RuleInfo, Inventory
+
+
+RULES = {
+    "-able": RuleInfo("-able", "SFX", "NOUN", "ADJ"),
+    "-ly": RuleInfo("-ly", "SFX", "ADJ", "ADV"),
+    "in-": RuleInfo("in-", "PFX", "ADJ", "ADJ"),
+}
+
+
+def lex(lemma: str, upos: str) -> LexItem:
+    return LexItem(lemma, lemma, upos)
+
+
+def make_analyses():
+    return {
+        lex("comfortable", "ADJ"):
+            WFToken(d_from=lex("comfort", "NOUN"), rule_id="-able"),
+        lex("uncomfortable", "ADJ"):
+            WFToken(d_from=lex("comfortable", "ADJ"), rule_id="in-"),
+        lex("uncomfortably", "ADV"):
+            WFToken(d_from=lex("uncomfortable", "ADJ"), rule_id="-ly"),
+    }
+
+
+def make_cyclic_analyses():
+    analyses = make_analyses()
+    # a <- b <- a, and c depends on the cycle
+    analyses[lex("a", "ADJ")] = WFToken(d_from=lex("b", "ADJ"), rule_id="in-")
+    analyses[lex("b", "ADJ")] = WFToken(d_from=lex("a", "ADJ"), rule_id="in-")
+    analyses[lex("c", "ADV")] = WFToken(d_from=lex("a", "ADJ"), rule_id="-ly")
+    return analyses
+
+
+def test_materialize_matches_lazy_trees():
+    lazy = Inventory(rules_by_ids=RULES, word_analyses=make_analyses())
+    inventory = Inventory(rules_by_ids=RULES, word_analyses=make_analyses())
+    assert inventory.materialize_all() == 3
+    for word in make_analyses():
+        assert str(inventory.word_trees[word]) == \
+            str(lazy.make_subword_tree(word))
+
+
+def test_parallel_materialize_matches_serial():
+    serial = Inventory(rules_by_ids=RULES, word_analyses=make_analyses())
+    serial.materialize_all()
+    parallel = Inventory(rules_by_ids=RULES, word_analyses=make_analyses())
+    parallel.materialize_all(n_workers=2, chunk_size=1)
+    assert {w: str(t) for w, t in serial.word_trees.items()} == \
+        {w: str(t) for w, t in parallel.word_trees.items()}
+
+
+def test_cycles_raise():
+    inventory = Inventory(
+        rules_by_ids=RULES, word_analyses=make_cyclic_analyses()
+    )
+    with pytest.raises(ValueError):
+        inventory.materialize_all()
+
+
+def test_cycles_are_skipped_with_ignore_errors(capsys):
+    inventory = Inventory(
+        rules_by_ids=RULES, word_analyses=make_cyclic_analyses()
+    )
+    assert inventory.materialize_all(ignore_errors=True) == 3
+    assert lex("uncomfortably", "ADV") in inventory.word_trees
+    assert lex("a", "ADJ") not in inventory.word_trees
+    assert lex("c", "ADV") not in inventory.word_trees
+    assert "Failed to build 3 trees" in capsys.readouterr().out
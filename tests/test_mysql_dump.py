@@ -0,0 +1,67 @@
+import io
+import os
+
+import pytest
+
+from data_readers import WordFormationLatinSQLReader
+from data_readers.mysql_dump import iter_insert_rows, parse_row
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+DUMP = "\n".join([
+    "-- MySQL dump",
+    "/*!40101 SET NAMES utf8 */;",
+    "CREATE TABLE `lemmario` (`id` int);",
+    "INSERT INTO `other` VALUES (1,'(skipped)');",
+    "INSERT INTO `lemmario` VALUES (1,'a''b',NULL,-2.5),"
+    "(2,'x\\'y\\\\z\\n',3,'(,)');",
+    "INSERT INTO `lemmas_wfr` (`a`, `b`) VALUES (7, 'VALUES'), (8,'');",
+    "UNLOCK TABLES;",
+    "",
+])
+
+ROWS = [
+    ("lemmario", (1, "a'b", None, -2.5)),
+    ("lemmario", (2, "x'y\\z\n", 3, "(,)")),
+    ("lemmas_wfr", (7, "VALUES")),
+    ("lemmas_wfr", (8, "")),
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_insert_rows_across_chunks(chunk_size):
+    rows = iter_insert_rows(
+        io.StringIO(DUMP), ("lemmario", "lemmas_wfr"), chunk_size=chunk_size
+    )
+    assert list(rows) == ROWS
+
+
+def test_insert_rows_of_selected_tables():
+    rows = iter_insert_rows(io.StringIO(DUMP), ("lemmas_wfr",), chunk_size=5)
+    assert list(rows) == ROWS[2:]
+
+
+def test_incomplete_row():
+    dump = "INSERT INTO `lemmario` VALUES (1,'abc"
+    with pytest.raises(ValueError):
+        list(iter_insert_rows(io.StringIO(dump), ("lemmario",), chunk_size=4))
+
+
+def test_parse_row():
+    assert parse_row("1, 'a, b' ,NULL,x") == (1, "a, b", None, "x")
+
+
+def test_sql_reader_sample():
+    path = os.path.join(DATA_DIR, "lat", "lemlat3", "sample.txt")
+    with open(path) as f:
+        rows = list(iter_insert_rows(f, ("lemmario", "lemmas_wfr"), 16))
+    assert [table for table, _ in rows] == \
+        ["lemmario", "lemmario", "lemmas_wfr"]
+
+    (word, analysis), = WordFormationLatinSQLReader("lat").read_dataset(
+        path
+    ).items()
+    assert (word.lemma, word.upos) == ("dulciorelocus", "NOUN")
+    assert (analysis.d_from.lemma, analysis.d_from.upos) == \
+        ("dulciorelocus", "ADJ")
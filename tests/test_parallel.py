@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from src.parallel import map_ordered
+from data_readers import (
+    AuCoProReader, CharDepsReader, DerivaTarioReader, GermaNetReader,
+    MorphyNetDerivationalReader
+)
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def square(x):
+    return x * x
+
+
+def test_map_ordered_keeps_task_order():
+    # a lazy iterator with more tasks than the window of pending results
+    tasks = ((x,) for x in range(50))
+    assert list(map_ordered(square, tasks, n_workers=3)) == \
+        [x * x for x in range(50)]
+
+
+def test_map_ordered_empty():
+    assert list(map_ordered(square, iter([]), n_workers=2)) == []
+
+
+def grow_sample(src, dst, n_copies, n_header_lines=0, blocks=False):
+    # distinct copies of the records, so that the file has many ranges
+    with open(src) as f:
+        lines = f.read().split("\n")
+    out = lines[:n_header_lines]
+    for i in range(n_copies):
+        for line in lines[n_header_lines:]:
+            if blocks:
+                out.append(line)
+            elif line:
+                out.append(f"x{i}{line}")
+    with open(dst, "w") as f:
+        f.write("\n".join(out))
+
+
+@pytest.mark.parametrize("reader_cls, lang, path, n_header_lines, blocks", [
+    (AuCoProReader, "afr", "afr/aucopro/sample.txt", 0, False),
+    (MorphyNetDerivationalReader, "eng", "eng/morphynet-d/sample.txt",
+     0, False),
+    (DerivaTarioReader, "ita", "ita/derivatario/sample.txt", 0, False),
+    (GermaNetReader, "deu", "deu/germanet/sample.txt", 2, False),
+    (CharDepsReader, "zho", "zho/chinesechardeps/sample.txt", 0, True),
+])
+def test_parallel_reading_matches_serial(
+        tmp_path, reader_cls, lang, path, n_header_lines, blocks
+):
+    dst = str(tmp_path / "dataset.txt")
+    grow_sample(
+        os.path.join(DATA_DIR, path), dst, 20, n_header_lines, blocks
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = [
+            (repr(k), repr(v)) for k, v in reader_cls(lang).iter_dataset(dst)
+        ]
+        for chunk_bytes in [1, 97, 512]:
+            reader = reader_cls(lang, n_workers=3, chunk_bytes=chunk_bytes)
+            assert len(reader._split_file(dst)) > 1
+            pairs = [
+                (repr(k), repr(v)) for k, v in reader.load_dataset(dst)
+            ]
+            assert pairs == expected
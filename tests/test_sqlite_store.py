@@ -0,0 +1,137 @@
+import io
+import multiprocessing
+import os
+import pickle
+
+import pytest
+
+from src import LexItem, Inventory, SQLiteInventoryStore
+from data_readers import UDerReader
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+TEXT = "\n\n".join([
+    "\n".join([
+        f"# sent_id = {i}",
+        "1\tder\tder\tDET\t_\t_\t2\tdet\t_\t_",
+        f"2\t{word}\t{word}\tNOUN\t_\t_\t0\troot\t_\t_",
+    ])
+    for i, word in enumerate(["Hauptgewinn", "Gewinner", "Gewinn"] * 2)
+]) + "\n"
+
+
+@pytest.fixture(scope="module")
+def inventory() -> Inventory:
+    inventory = UDerReader("deu").build_inventory(
+        os.path.join(DATA_DIR, "deu", "derivbase-uder", "sample.txt"),
+        rules_path=os.path.join(DATA_DIR, "deu", "rules_sample.json")
+    )
+    inventory.materialize_all()
+    return inventory
+
+
+def test_sqlite_store_matches_inventory(tmp_path, inventory):
+    path = str(tmp_path / "store.sqlite")
+    with SQLiteInventoryStore(path) as store:
+        store.add_inventory(inventory, batch_size=7)
+        for name in SQLiteInventoryStore.TABLES:
+            assert len(getattr(store, name)) == \
+                len(getattr(inventory, name))
+        assert set(store.word_analyses) == set(inventory.word_analyses)
+        assert dict(store.rules_by_ids.items()) == inventory.rules_by_ids
+
+    # a new connection reads the file
+    with SQLiteInventoryStore(path) as store:
+        stored = store.make_inventory()
+        for word in inventory.word_analyses:
+            assert store.word_analyses[word] == inventory.word_analyses[word]
+            assert str(stored.make_subword_tree(word)) == \
+                str(inventory.make_subword_tree(word))
+
+
+def test_sqlite_mapping_operations(tmp_path, inventory):
+    word, analysis = next(iter(inventory.word_analyses.items()))
+    with SQLiteInventoryStore(str(tmp_path / "store.sqlite")) as store:
+        mapping = store.word_analyses
+        assert word not in mapping
+        # the cached miss is dropped on writes
+        mapping[word] = analysis
+        assert mapping[word] == analysis
+        assert len(mapping) == 1
+
+        int_lid = LexItem(word.lemma, word.form, word.upos, lid=1)
+        mapping.update({int_lid: analysis})
+        assert set(mapping) == {word, int_lid}
+        assert LexItem(word.lemma, word.form, word.upos, lid="1") \
+            not in mapping
+        assert "not a word" not in mapping
+
+        assert set(mapping.find(word.lemma)) == {word, int_lid}
+        assert set(mapping.find(word.lemma, upos="X")) == set()
+
+        del mapping[word]
+        assert word not in mapping
+        with pytest.raises(KeyError):
+            del mapping[word]
+
+        assert mapping.update_many(
+            ((LexItem(f"w{i}"), analysis) for i in range(25)),
+            batch_size=10
+        ) == 25
+        assert len(mapping) == 26
+
+
+def test_sqlite_store_is_pickled_by_path(tmp_path, inventory):
+    path = str(tmp_path / "store.sqlite")
+    with SQLiteInventoryStore(path, cache_size=5) as store:
+        store.add_inventory(inventory)
+        copied = pickle.loads(pickle.dumps(store))
+        try:
+            assert copied.cache_size == 5
+            assert set(copied.word_trees) == set(store.word_trees)
+        finally:
+            copied.close()
+
+
+# the store inherited by the forked workers, not pickled
+_forked_store = None
+
+
+def _read_forked_store(word):
+    connection = _forked_store.connection
+    assert _forked_store._pid == os.getpid()
+    return connection is _forked_store.connection, \
+        _forked_store.word_analyses[word]
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs fork"
+)
+def test_sqlite_store_reconnects_after_fork(tmp_path, inventory):
+    global _forked_store
+    path = str(tmp_path / "store.sqlite")
+    words = list(inventory.word_analyses)[:4]
+    with SQLiteInventoryStore(path) as store:
+        store.add_inventory(inventory)
+        parent_connection = store.connection
+        _forked_store = store
+        try:
+            with multiprocessing.get_context("fork").Pool(2) as pool:
+                results = pool.map(_read_forked_store, words)
+        finally:
+            _forked_store = None
+        assert results == [
+            (True, inventory.word_analyses[word]) for word in words
+        ]
+        # the parent keeps its connection
+        assert store.connection is parent_connection
+
+        stored = store.make_inventory()
+        trees = list(stored.iter_trees(
+            io.StringIO(TEXT), n_workers=2, chunk_size=1
+        ))
+        assert [str(tree) for tree in trees] == [
+            str(tree) for tree in stored.iter_trees(io.StringIO(TEXT))
+        ]
@@ -0,0 +1,51 @@
+from src import LexItem, WFToken, RuleInfo, Inventory
+
+
+RULES = {
+    "-able": RuleInfo("-able", "SFX", "NOUN", "ADJ"),
+    "-ly": RuleInfo("-ly", "SFX", "ADJ", "ADV"),
+}
+
+
+def lex(lemma: str, upos: str) -> LexItem:
+    return LexItem(lemma, lemma, upos)
+
+
+COMFORTABLE = lex("comfortable", "ADJ")
+COMFORTABLY = lex("comfortably", "ADV")
+
+
+def make_inventory(**kwargs) -> Inventory:
+    return Inventory(
+        rules_by_ids=dict(RULES),
+        word_analyses={
+            COMFORTABLE:
+                WFToken(d_from=lex("comfort", "NOUN"), rule_id="-able"),
+            COMFORTABLY: WFToken(d_from=COMFORTABLE, rule_id="-ly"),
+        },
+        **kwargs
+    )
+
+
+def test_tree_cache():
+    inventory = make_inventory()
+    tree = str(inventory.make_subword_tree(COMFORTABLY))
+    # the base tree is cached on the way
+    assert inventory.cache_info() == \
+        {"hits": 0, "misses": 2, "size": 2, "max_size": 100000}
+    assert str(inventory.make_subword_tree(COMFORTABLY)) == tree
+    assert inventory.cache_info()["hits"] == 1
+
+    inventory.clear_cache()
+    assert inventory.cache_info()["size"] == 0
+
+
+def test_tree_cache_size():
+    inventory = make_inventory(cache_size=1)
+    inventory.make_subword_tree(COMFORTABLY)
+    assert inventory.cache_info()["size"] == 1
+
+    uncached = make_inventory(cache_size=0)
+    assert str(uncached.make_subword_tree(COMFORTABLY)) == \
+        str(make_inventory().make_subword_tree(COMFORTABLY))
+    assert uncached.cache_info()["size"] == 0
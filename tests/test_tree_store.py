@@ -0,0 +1,79 @@
+import os
+import pickle
+
+import pytest
+
+from src import LexItem, Inventory, TreeStore
+from data_readers import UDerReader
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.fixture(scope="module")
+def inventory() -> Inventory:
+    inventory = UDerReader("deu").build_inventory(
+        os.path.join(DATA_DIR, "deu", "derivbase-uder", "sample.txt"),
+        rules_path=os.path.join(DATA_DIR, "deu", "rules_sample.json")
+    )
+    inventory.materialize_all()
+    return inventory
+
+
+def test_tree_store_round_trip(tmp_path, inventory):
+    path = str(tmp_path / "trees.bin")
+    assert TreeStore.write(path, inventory.word_trees) == \
+        len(inventory.word_trees)
+    with TreeStore(path) as store:
+        assert len(store) == len(inventory.word_trees)
+        assert set(store) == set(inventory.word_trees)
+        for word, tree in inventory.word_trees.items():
+            assert word in store
+            assert str(store[word]) == str(tree)
+            assert store[word].root_idx == tree.root_idx
+        missing = LexItem("Nichtwort", "Nichtwort", "NOUN")
+        assert missing not in store
+        assert "not a word" not in store
+        with pytest.raises(KeyError):
+            store[missing]
+
+
+def test_tree_store_keeps_field_types(tmp_path, inventory):
+    word, tree = next(iter(inventory.word_trees.items()))
+    int_lid = LexItem(word.lemma, word.form, word.upos, lid=7, lang=None)
+    path = str(tmp_path / "trees.bin")
+    TreeStore.write(path, {int_lid: tree, word: tree})
+    with TreeStore(path) as store:
+        assert set(store) == {int_lid, word}
+        # "7" and 7 are different words
+        assert LexItem(word.lemma, word.form, word.upos, lid="7") \
+            not in store
+
+
+def test_tree_store_is_pickled_by_path(tmp_path, inventory):
+    path = str(tmp_path / "trees.bin")
+    TreeStore.write(path, inventory.word_trees)
+    with TreeStore(path) as store:
+        state = pickle.dumps(store)
+        assert len(state) < 1000
+        with pickle.loads(state) as copied:
+            assert set(copied) == set(store)
+
+
+def test_tree_store_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        TreeStore(str(path))
+
+
+def test_tree_store_as_word_trees(tmp_path, inventory):
+    path = str(tmp_path / "trees.bin")
+    TreeStore.write(path, inventory.word_trees)
+    with TreeStore(path) as store:
+        stored = Inventory(
+            rules_by_ids=inventory.rules_by_ids, word_trees=store
+        )
+        for word in inventory.word_trees:
+            assert str(stored.make_subword_tree(word)) == \
+                str(inventory.make_subword_tree(word))
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from data_readers import UDerReader
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def record(lid, lemma, pos, par="", wf_meta=""):
+    return "\t".join([
+        lid, f"{lemma}#{pos}", lemma, pos, "", "", par, wf_meta, "", "{}"
+    ])
+
+
+LINES = [
+    record("1.0", "Haus", "NOUN"),
+    record("1.1", "Häuschen", "NOUN", "1.0", "Rule=dNN01&Type=Derivation"),
+    # no Rule: skipped
+    record("1.2", "Hausen", "VERB", "1.0", "Type=Derivation"),
+    # a compound of the next family: deferred
+    record(
+        "1.3", "Hausboot", "NOUN", "1.0",
+        "Rule=cNN01&Type=Compounding&Sources=1.0,2.0"
+    ),
+    # the parent is not in the dataset
+    record("1.4", "Haustür", "NOUN", "9.0", "Rule=dNN02&Type=Derivation"),
+    record("2.0", "Boot", "NOUN"),
+    record("2.1", "Bötchen", "NOUN", "2.0", "Rule=dNN01&Type=Derivation"),
+    # repeats the deferred word 1.3, so it wins
+    record("2.2", "Hausboot", "NOUN", "2.0", "Rule=dNN03&Type=Derivation"),
+    record("3.0", "Tür", "NOUN"),
+    # deferred, after the other record of the same word
+    record(
+        "3.1", "Bötchen", "NOUN", "3.0",
+        "Rule=cNN02&Type=Compounding&Sources=3.0,2.0"
+    ),
+]
+
+
+def read_reference(reader, lines):
+    # the whole-file algorithm the streaming reader must agree with
+    id_to_lemma = reader._read_id_to_lemma(lines)
+    results = {}
+    for line in lines:
+        try:
+            analyses = reader.read_sample(line, id_to_lemma)
+        except KeyError:
+            continue
+        for word, analysis in analyses:
+            results[word] = analysis
+    return results
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "uder.tsv"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_matches_whole_file_reading(path):
+    reader = UDerReader("deu")
+    dataset = reader.read_dataset(path)
+    assert dataset == read_reference(reader, LINES)
+    rules = {
+        word.lemma: analysis.rule_id for word, analysis in dataset.items()
+    }
+    assert rules == {
+        "Häuschen": "dNN01", "Bötchen": "cNN02", "Hausboot": "dNN03"
+    }
+
+
+def test_parallel_matches_serial(path):
+    serial = list(UDerReader("deu").iter_dataset(path))
+    parallel = list(
+        UDerReader("deu", n_workers=2, chunk_bytes=64).iter_dataset(path)
+    )
+    assert parallel == serial
+
+
+def test_samples():
+    for sample in [
+        "deu/derivbase-uder/sample.txt",
+        "rus/derivbaseru-uder/sample.txt",
+        "rus/rucompounds-uder/sample.txt",
+    ]:
+        sample = os.path.join(DATA_DIR, sample)
+        reader = UDerReader("rus")
+        with open(sample, "r") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        assert reader.read_dataset(sample) == read_reference(reader, lines)
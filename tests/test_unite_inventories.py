@@ -0,0 +1,57 @@
+from collections import ChainMap
+
+from src import LexItem, WFToken, RuleInfo, Inventory, unite_inventories
+
+
+RULES = {
+    "-able": RuleInfo("-able", "SFX", "NOUN", "ADJ"),
+    "-ly": RuleInfo("-ly", "SFX", "ADJ", "ADV"),
+}
+
+
+def lex(lemma: str, upos: str) -> LexItem:
+    return LexItem(lemma, lemma, upos)
+
+
+COMFORTABLE = lex("comfortable", "ADJ")
+COMFORTABLY = lex("comfortably", "ADV")
+
+
+def make_inventory(**kwargs) -> Inventory:
+    return Inventory(
+        rules_by_ids=dict(RULES),
+        word_analyses={
+            COMFORTABLE:
+                WFToken(d_from=lex("comfort", "NOUN"), rule_id="-able"),
+            COMFORTABLY: WFToken(d_from=COMFORTABLE, rule_id="-ly"),
+        },
+        **kwargs
+    )
+
+
+def test_unite_inventories():
+    first = make_inventory()
+    second = Inventory(
+        rules_by_ids=dict(RULES),
+        word_analyses={
+            COMFORTABLY: WFToken(d_from=lex("comfort", "NOUN"), rule_id="-ly")
+        }
+    )
+    lazy = unite_inventories(first, second)
+    assert isinstance(lazy.word_analyses, ChainMap)
+    plain = unite_inventories(first, second, lazy=False)
+    assert isinstance(plain.word_analyses, dict)
+    # the later inventories win
+    assert lazy.word_analyses[COMFORTABLY].d_from == lex("comfort", "NOUN")
+    assert dict(lazy.word_analyses) == plain.word_analyses
+    for word in [COMFORTABLE, COMFORTABLY]:
+        assert str(lazy.make_subword_tree(word)) == \
+            str(plain.make_subword_tree(word))
+
+    # new entries go to the own layer of the view
+    lazy.word_analyses[lex("x", "ADV")] = WFToken(COMFORTABLE, "-ly")
+    assert lex("x", "ADV") not in first.word_analyses
+    lazy.compact()
+    assert dict(lazy.word_analyses) == {
+        **plain.word_analyses, lex("x", "ADV"): WFToken(COMFORTABLE, "-ly")
+    }
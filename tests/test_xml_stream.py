@@ -0,0 +1,49 @@
+import os
+
+from data_readers import ElixirFMReader
+from data_readers.xml_stream import iter_xml_elements
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def test_xml_elements(tmp_path):
+    path = tmp_path / "doc.xml"
+    path.write_text(
+        "<root><group name='g1'><item>1</item><item>2</item></group>"
+        "<group name='g2'><item>3</item></group></root>"
+    )
+    seen = []
+    for ancestors, item in iter_xml_elements(str(path), depth=2):
+        assert [elem.tag for elem in ancestors] == ["root", "group"]
+        seen.append((ancestors[1].get("name"), item.text))
+    assert seen == [("g1", "1"), ("g1", "2"), ("g2", "3")]
+
+    groups = []
+    for ancestors, group in iter_xml_elements(str(path), depth=1):
+        root = ancestors[0]
+        groups.append([item.text for item in group])
+    assert groups == [["1", "2"], ["3"]]
+    # the processed elements are dropped
+    assert len(root) == 0
+
+
+def test_elixirfm_reader_over_repeated_clusters(tmp_path):
+    # the elements are dropped once read, the later ones must not lose
+    # their ancestors, e. g. the root of their nest
+    path = os.path.join(DATA_DIR, "arb", "elixirfm", "sample.xml")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    start, end = text.index("<data>") + len("<data>"), text.index("</data>")
+    repeated = tmp_path / "repeated.xml"
+    repeated.write_text(
+        text[:start] + text[start:end] * 3 + text[end:], encoding="utf-8"
+    )
+
+    reader = ElixirFMReader("arb")
+    expected = reader.read_dataset(path)
+    assert len(expected) == 43
+    pairs = list(reader.iter_dataset(str(repeated)))
+    assert len(pairs) == 3 * len(list(reader.iter_dataset(path)))
+    assert {k: str(v) for k, v in pairs} == \
+        {k: str(v) for k, v in expected.items()}